@@ -3,6 +3,8 @@ import sys
 import os
 import tempfile
 import shutil
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add project root to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -14,6 +16,16 @@ from query.result_formatter import ResultFormatter
 
 class TestErrorHandling(unittest.TestCase):
     
+    @classmethod
+    def setUpClass(cls):
+        """Create the worker pool used by the concurrency tests."""
+        cls._pool = ThreadPoolExecutor(max_workers=4)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Shut down the worker pool."""
+        cls._pool.shutdown()
+    
     def setUp(self):
         """Set up test fixtures before each test method."""
         self.query_processor = QueryProcessor()
@@ -60,12 +72,32 @@ class TestErrorHandling(unittest.TestCase):
     
     def test_search_unicode_characters(self):
         """Test search with unicode characters."""
-        query = Query()
-        unicode_query = "python программирование 编程"
-        results = query.search(unicode_query, max_results=5)
+        # Index a page about "café" the way the indexer would tokenize it
+        terms = self.query_processor.process_query(unicodedata.normalize('NFC', "Café guide"))
+        inverted_index = {term: {'cafe.html': 0.9} for term in terms}
+        inverted_index['python'] = {'python.html': 0.8}
+        metadata = {
+            'cafe.html': {'title': 'Café Guide', 'url': 'http://example.com/cafe'},
+            'python.html': {'title': 'Python', 'url': 'http://example.com/python'}
+        }
+        unicode_query = unicodedata.normalize('NFC', "café программирование 编程")
+        results = Query.from_dicts(inverted_index, metadata).search(unicode_query, max_results=5)
+        self.assertEqual([r['doc_id'] for r in results], ['cafe.html'])
         
-        # Should handle unicode gracefully
-        self.assertIsInstance(results, list)
+        # Decomposed input should find the same documents, through a fresh
+        # Query so the NFC result cache is not consulted
+        nfd_query = unicodedata.normalize('NFD', unicode_query)
+        self.assertNotEqual(nfd_query, unicode_query)
+        nfd_results = Query.from_dicts(inverted_index, metadata).search(nfd_query, max_results=5)
+        self.assertEqual([r['doc_id'] for r in nfd_results], ['cafe.html'])
+        self.assertEqual(nfd_results, results)
+    
+    def test_query_unicode_normalization(self):
+        """Test that NFC and NFD forms of a query produce the same tokens."""
+        query = "Café résumé naïve"
+        nfc_tokens = self.query_processor.process_query(unicodedata.normalize('NFC', query))
+        nfd_tokens = self.query_processor.process_query(unicodedata.normalize('NFD', query))
+        self.assertEqual(nfc_tokens, nfd_tokens)
     
     def test_search_numeric_query(self):
         """Test search with numeric query."""
@@ -199,33 +231,23 @@ class TestErrorHandling(unittest.TestCase):
         """Test multiple searches happening simultaneously."""
         query = Query()
         
-        # Simulate multiple searches
-        import threading
-        import time
-        
         results_list = []
         errors_list = []
         
-        def search_worker(query_text):
+        # Submit the searches to the shared pool
+        search_terms = ["python", "javascript", "machine learning", "web development"]
+        futures = {
+            self._pool.submit(query.search, term, max_results=3): term
+            for term in search_terms
+        }
+        
+        for future in as_completed(futures):
+            query_text = futures[future]
             try:
-                results = query.search(query_text, max_results=3)
-                results_list.append((query_text, results))
+                results_list.append((query_text, future.result()))
             except Exception as e:
                 errors_list.append((query_text, str(e)))
         
-        # Start multiple search threads
-        threads = []
-        search_terms = ["python", "javascript", "machine learning", "web development"]
-        
-        for term in search_terms:
-            thread = threading.Thread(target=search_worker, args=(term,))
-            threads.append(thread)
-            thread.start()
-        
-        # Wait for all threads to complete
-        for thread in threads:
-            thread.join()
-        
         # Check that all searches completed without errors
         self.assertEqual(len(errors_list), 0, f"Errors occurred: {errors_list}")
         self.assertEqual(len(results_list), len(search_terms))
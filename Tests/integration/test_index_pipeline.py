@@ -0,0 +1,215 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import json
+import unittest.mock
+
+from lxml import etree
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from index.indexer import Indexer, MIN_PARALLEL_DOCUMENTS, MAX_PROCESS_CHUNKSIZE, process_chunksize
+from index.text_processor import TextProcessor, PARSE_CHUNK_SIZE
+from index.tfidf_calculator import TFIDFCalculator
+from index.inverted_indexer import CompactInvertedIndex, MappedInvertedIndex, MAPPED_POSTINGS_FILE
+from query.query import Query
+
+TOPICS = ['python', 'javascript', 'machine learning', 'web development', 'databases']
+
+class TestIndexPipeline(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Write a small crawl of HTML pages once for all test methods."""
+        cls.test_dir = tempfile.mkdtemp()
+        cls.data_dir = os.path.join(cls.test_dir, 'pages')
+        os.makedirs(cls.data_dir)
+
+        cls.num_documents = MIN_PARALLEL_DOCUMENTS + 6
+        with open(os.path.join(cls.data_dir, 'metadata.jsonl'), 'w', encoding='utf-8') as meta:
+            for i in range(cls.num_documents):
+                topic = TOPICS[i % len(TOPICS)]
+                html_filename = f'{cls.data_dir}/page{i}.html'
+                with open(html_filename, 'w', encoding='utf-8') as f:
+                    f.write(
+                        f'<html><head><title>{topic.title()} page {i}</title>'
+                        f'<style>body {{ color: red; }}</style></head>'
+                        f'<body><h1>{topic}</h1><p>Notes about {topic} number{i}.</p>'
+                        f'<script>var hidden = "script";</script></body></html>'
+                    )
+                meta.write(json.dumps({
+                    'original_url': f'http://example.com/{i}',
+                    'filename': html_filename,
+                    'status_code': 200
+                }) + '\n')
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after all tests have run."""
+        shutil.rmtree(cls.test_dir)
+
+    def test_parallel_processing_matches_serial(self):
+        """Test that the process pool produces the same documents as the serial path."""
+        documents = Indexer(data_dir=self.data_dir).load_crawled_data()
+        serial = Indexer(data_dir=self.data_dir, max_workers=1).process_documents(documents)
+        parallel = Indexer(data_dir=self.data_dir, max_workers=2).process_documents(documents)
+
+        self.assertEqual(len(serial), self.num_documents)
+        self.assertEqual(serial.keys(), parallel.keys())
+        # Tokens are interned on both paths, so equal terms are one object
+        self.assertIs(serial['page0']['tokens'][0], parallel['page5']['tokens'][0])
+        for doc_id, doc in serial.items():
+            self.assertEqual(doc['tokens'], parallel[doc_id]['tokens'])
+            self.assertEqual(doc['metadata']['title'], parallel[doc_id]['metadata']['title'])
+            self.assertEqual(doc['metadata']['url'], parallel[doc_id]['metadata']['url'])
+
+    def test_process_chunksize(self):
+        """Test that pool tasks are sized to about four per worker, within bounds."""
+        self.assertEqual(process_chunksize(70, 8), 2)
+        self.assertEqual(process_chunksize(800, 4), 50)
+        self.assertEqual(process_chunksize(10, 8), 1)
+        self.assertEqual(process_chunksize(100000, 2), MAX_PROCESS_CHUNKSIZE)
+
+    def test_processed_tokens(self):
+        """Test that titles, text and metadata are extracted and scripts/styles dropped."""
+        indexer = Indexer(data_dir=self.data_dir, max_workers=1)
+        doc = indexer.process_documents(['page2.html'])['page2']
+
+        self.assertEqual(doc['metadata']['title'], 'Machine Learning page 2')
+        self.assertEqual(doc['metadata']['url'], 'http://example.com/2')
+        self.assertEqual(doc['tokens'], ['machine', 'learning', 'page', '2', 'machine', 'learning',
+                                         'notes', 'about', 'machine', 'learning', 'number2'])
+
+    def test_text_extraction_edge_cases(self):
+        """Test text around removed scripts, empty pages and empty titles."""
+        processor = TextProcessor()
+        html = b'<p>alpha</p><p>beta</p>gamma<script>x()</script>delta<style>p {}</style>omega'
+        self.assertEqual(processor.extract_text_from_html(html), 'alpha beta gamma delta omega')
+
+        # Template content is inert markup, not page text
+        self.assertEqual(processor.process_document(b'<p>a</p><template><p>tmpl</p></template>')[0], [])
+        # A stray doctype separates the text on either side of it
+        self.assertEqual(processor.process_document(b'<p>foo<!DOCTYPE html>bar</p>')[0], ['foo', 'bar'])
+        self.assertEqual(processor.process_document(b'foo<!DOCTYPE html>bar')[0], ['foo', 'bar'])
+
+        # Words split across feed chunks and entities stay whole
+        padding = b'<p>' + b'x' * (PARSE_CHUNK_SIZE - 5) + b'</p>'
+        html = padding + b'<p>stream&amp;ing wor\xc3\xa9d</p>'
+        self.assertEqual(processor.extract_text_from_html(html).split()[1:], ['stream&ing', 'wor\xe9d'])
+
+        self.assertEqual(processor.process_document(b'')[0], [])
+        self.assertEqual(processor.process_document(b'')[1]['title'], 'No title')
+        self.assertEqual(processor.process_document('<title></title>text')[1]['title'], '')
+
+    def test_process_document_parses_once(self):
+        """Test that title and text come from a single parse of the page."""
+        processor = TextProcessor()
+        html = b'<html><head><title>Once</title></head><body><p>parsed once</p></body></html>'
+        with unittest.mock.patch('index.text_processor.etree.HTMLParser',
+                                 wraps=etree.HTMLParser) as html_parser:
+            tokens, metadata = processor.process_document(html)
+
+        html_parser.assert_called_once()
+        self.assertEqual(metadata['title'], 'Once')
+        self.assertEqual(tokens, ['once', 'parsed', 'once'])
+
+    def test_tfidf_matrix_matches_per_document_scores(self):
+        """Test that the corpus-wide TF-IDF pass matches the per-document methods."""
+        indexer = Indexer(data_dir=self.data_dir, max_workers=1)
+        processed = indexer.process_documents(indexer.load_crawled_data())
+        all_tokens = [doc['tokens'] for doc in processed.values()] + [[]]
+
+        calculator = TFIDFCalculator()
+        document_count = calculator.calculate_document_count(all_tokens)
+        idf = calculator.calculate_idf(document_count, len(all_tokens))
+        expected = [
+            calculator.calculate_tfidf_scores(calculator.calculate_term_frequency(tokens),
+                                              document_count, len(all_tokens), idf)
+            if tokens else {}
+            for tokens in all_tokens
+        ]
+
+        self.assertEqual(calculator.build_tfidf_matrix(all_tokens), expected)
+
+    def test_legacy_meta_files(self):
+        """Test that per-page .meta files are used for pages missing from metadata.jsonl."""
+        data_dir = os.path.join(self.test_dir, 'legacy')
+        os.makedirs(data_dir)
+        with open(os.path.join(data_dir, 'old.html'), 'w', encoding='utf-8') as f:
+            f.write('<html><head><title>Old</title></head><body>legacy page</body></html>')
+        with open(os.path.join(data_dir, 'old.meta'), 'w', encoding='utf-8') as f:
+            json.dump({'original_url': 'http://example.com/old'}, f)
+        with open(os.path.join(data_dir, 'bare.html'), 'w', encoding='utf-8') as f:
+            f.write('<html><body>no metadata</body></html>')
+
+        indexer = Indexer(data_dir=data_dir, max_workers=1)
+        processed = indexer.process_documents(indexer.load_crawled_data())
+
+        self.assertEqual(processed['old']['metadata']['url'], 'http://example.com/old')
+        self.assertEqual(processed['bare']['metadata']['url'], 'No URL')
+
+    def test_build_index_then_search(self):
+        """Test building an index from pages and searching it."""
+        index_dir = os.path.join(self.test_dir, 'index')
+        Indexer(data_dir=self.data_dir, index_dir=index_dir).build_index()
+
+        query = Query(index_dir=index_dir)
+        self.assertEqual(query.get_search_stats()['total_documents'], self.num_documents)
+
+        results = query.search('number7', max_results=5)
+        self.assertEqual([r['doc_id'] for r in results], ['page7'])
+        self.assertEqual(results[0]['url'], 'http://example.com/7')
+
+        results = query.search('javascript', max_results=100)
+        self.assertEqual(len(results), len(range(1, self.num_documents, len(TOPICS))))
+        self.assertIsInstance(query.inverted_index, MappedInvertedIndex)
+
+        # postings.bin from another build (as seen mid-rebuild) is rejected
+        # and the JSON index is loaded instead
+        postings_file = os.path.join(index_dir, MAPPED_POSTINGS_FILE)
+        with open(postings_file, 'r+b') as f:
+            f.seek(8)
+            f.write(bytes(8))
+        mismatched = Query(index_dir=index_dir)
+        self.assertEqual(mismatched.search('javascript', max_results=100), results)
+        self.assertNotIsInstance(mismatched.inverted_index, MappedInvertedIndex)
+
+        # Without the mapped postings the JSON index is loaded instead
+        os.remove(postings_file)
+        fallback = Query(index_dir=index_dir)
+        self.assertEqual(fallback.search('javascript', max_results=100), results)
+        self.assertNotIsInstance(fallback.inverted_index, MappedInvertedIndex)
+        self.assertIsInstance(fallback.inverted_index, CompactInvertedIndex)
+
+    def test_result_cache(self):
+        """Test cached results are copies, expire, and reset when the index is rebuilt."""
+        index_dir = os.path.join(self.test_dir, 'cached_index')
+        indexer = Indexer(data_dir=self.data_dir, index_dir=index_dir)
+        indexer.build_index()
+
+        query = Query(index_dir=index_dir)
+        results = query.search('Number3!', max_results=5)
+        results[0]['title'] = 'changed'
+        with unittest.mock.patch.object(query.search_engine, 'search') as search:
+            cached = query.search('number3', max_results=5)
+        search.assert_not_called()
+        self.assertEqual(cached[0]['title'], 'Web Development page 3')
+
+        expired = Query(index_dir=index_dir, cache_ttl=-1)
+        expired.search('number3', max_results=5)
+        with unittest.mock.patch.object(expired.search_engine, 'search', return_value={}) as search:
+            self.assertEqual(expired.search('number3', max_results=5), [])
+        search.assert_called_once()
+
+        # Rebuild from a crawl without page3; the stale cached hit must go
+        data_dir = os.path.join(self.test_dir, 'smaller_crawl')
+        shutil.copytree(self.data_dir, data_dir)
+        os.remove(os.path.join(data_dir, 'page3.html'))
+        Indexer(data_dir=data_dir, index_dir=index_dir).build_index()
+        self.assertEqual(query.search('number3', max_results=5), [])
+
+if __name__ == '__main__':
+    unittest.main()
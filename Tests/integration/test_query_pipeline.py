@@ -12,22 +12,18 @@ from query.query import Query
 
 class TestQueryPipeline(unittest.TestCase):
     
-    def setUp(self):
-        """Set up test fixtures before each test method."""
-        # Create temporary directories
-        self.test_dir = tempfile.mkdtemp()
-        self.data_dir = os.path.join(self.test_dir, 'data')
-        self.index_dir = os.path.join(self.test_dir, 'index')
-        os.makedirs(self.data_dir)
-        os.makedirs(self.index_dir)
-        
+    @classmethod
+    def setUpClass(cls):
+        """Set up shared fixtures once for all test methods."""
         # Create test data
-        self.create_test_index()
+        cls.test_inverted_index, cls.test_metadata = cls.create_test_index()
         
-        # Create query instance
-        self.query = Query(index_dir=self.index_dir)
+        # Create query instance over the in-memory index (searches are
+        # read-only, so it is shared)
+        cls.query = Query.from_dicts(cls.test_inverted_index, cls.test_metadata)
     
-    def create_test_index(self):
+    @staticmethod
+    def create_test_index():
         """Create a test index for integration testing."""
         # Create test inverted index
         test_inverted_index = {
@@ -100,70 +96,70 @@ class TestQueryPipeline(unittest.TestCase):
             }
         }
         
-        # Save test index files
-        index_file = os.path.join(self.index_dir, 'inverted_index.json')
-        with open(index_file, 'w', encoding='utf-8') as f:
-            json.dump(test_inverted_index, f, indent=2)
-        
-        metadata_file = os.path.join(self.index_dir, 'document_metadata.json')
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(test_metadata, f, indent=2)
+        return test_inverted_index, test_metadata
     
-    def test_complete_search_pipeline(self):
-        """Test the complete search pipeline end-to-end."""
-        results = self.query.search("python programming", max_results=5)
+    def test_search_from_index_files(self):
+        """Test that an index loaded from disk searches like the in-memory one."""
+        test_dir = tempfile.mkdtemp()
         
-        # Check basic structure
-        self.assertIsInstance(results, list)
-        self.assertGreater(len(results), 0, "Should return some results")
-        
-        # Check result structure
-        for result in results:
-            self.assertIsInstance(result, dict)
-            self.assertIn('doc_id', result)
-            self.assertIn('score', result)
-            self.assertIn('title', result)
-            self.assertIn('url', result)
-            self.assertIn('author', result)
-            self.assertIn('category', result)
+        try:
+            # Save test index files
+            index_file = os.path.join(test_dir, 'inverted_index.json')
+            with open(index_file, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(self.test_inverted_index, separators=(',', ':')))
+            
+            metadata_file = os.path.join(test_dir, 'document_metadata.json')
+            with open(metadata_file, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(self.test_metadata, separators=(',', ':')))
+            
+            query = Query(index_dir=test_dir)
+            results = query.search("python programming", max_results=5)
+            
+            self.assertEqual(results, self.query.search("python programming", max_results=5))
+            self.assertEqual(query.get_search_stats()['total_documents'], 5)
+            
+        finally:
+            shutil.rmtree(test_dir)
     
-    def test_search_with_different_queries(self):
-        """Test various query types."""
-        test_queries = [
-            ("python", "Should find Python-related documents"),
-            ("javascript", "Should find JavaScript-related documents"),
-            ("machine learning", "Should find ML-related documents"),
-            ("web development", "Should find web development documents"),
-            ("programming", "Should find programming documents")
-        ]
-        
-        for query_text, description in test_queries:
+    # (query, max_results, keys every result must carry)
+    SEARCH_CASES = [
+        ("python programming", 5, {'doc_id', 'score', 'title', 'url', 'author', 'category'}),
+        ("python", 3, {'doc_id', 'score', 'title', 'url', 'author', 'category'}),
+        ("javascript", 3, {'doc_id', 'score', 'title', 'url'}),
+        ("machine learning", 3, {'doc_id', 'score', 'title', 'url'}),
+        ("web development", 3, {'doc_id', 'score', 'title', 'url'}),
+        ("programming", 3, {'doc_id', 'score', 'title', 'url'}),
+    ]
+    
+    def test_search_pipeline_queries(self):
+        """Test the complete search pipeline end-to-end for various query types."""
+        for query_text, max_results, required in self.SEARCH_CASES:
             with self.subTest(query=query_text):
-                results = self.query.search(query_text, max_results=3)
+                results = self.query.search(query_text, max_results=max_results)
                 
-                # Basic validation
-                self.assertIsInstance(results, list, f"{description}: Results should be a list")
-                self.assertGreaterEqual(len(results), 0, f"{description}: Should return results or empty list")
+                # Check basic structure
+                self.assertIsInstance(results, list)
+                self.assertGreater(len(results), 0, "Should return some results")
                 
                 # Check result structure
                 for result in results:
-                    self.assertIn('doc_id', result, f"{description}: Result should have doc_id")
-                    self.assertIn('score', result, f"{description}: Result should have score")
-                    self.assertIn('title', result, f"{description}: Result should have title")
-                    self.assertIn('url', result, f"{description}: Result should have url")
+                    self.assertIsInstance(result, dict)
+                    result_keys = result.keys()
+                    self.assertTrue(
+                        required.issubset(result_keys),
+                        f"Result missing keys: {sorted(required - result_keys)}"
+                    )
+    
+    def _assert_nonincreasing(self, seq):
+        """Assert seq is sorted highest first, showing the whole sequence on failure."""
+        self.assertEqual(seq, sorted(seq, reverse=True))
     
     def test_search_result_ranking(self):
         """Test that results are properly ranked by score."""
         results = self.query.search("python programming", max_results=10)
         
         # Check that results are sorted by score (highest first)
-        if len(results) > 1:
-            for i in range(len(results) - 1):
-                self.assertGreaterEqual(
-                    results[i]['score'], 
-                    results[i + 1]['score'],
-                    f"Result {i} should have higher or equal score than result {i + 1}"
-                )
+        self._assert_nonincreasing([r['score'] for r in results])
     
     def test_search_max_results_limit(self):
         """Test that max_results limit is respected."""
@@ -214,9 +210,5 @@ class TestQueryPipeline(unittest.TestCase):
             self.assertIsInstance(results, list)
             # Each search should work independently
     
-    def tearDown(self):
-        """Clean up after each test."""
-        shutil.rmtree(self.test_dir)
-
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
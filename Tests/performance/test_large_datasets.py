@@ -2,101 +2,254 @@ import unittest
 import sys
 import os
 import time
+import gc
 import tempfile
+import tracemalloc
 import shutil
 import json
 import random
+import statistics
 import string
+from contextlib import contextmanager
+from itertools import accumulate
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
+
+# For run-to-run reproducible timings, fix hash randomization as well:
+#   PYTHONHASHSEED=0 python -m pytest Tests/performance/
 
 # Add project root to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from query.query import Query
+from index.indexer import Indexer
+from index.inverted_indexer import MappedInvertedIndex, write_mapped_index
+
+# Seed for the generated benchmark index; bump the cache version below
+# whenever the seed or the generator changes
+BENCH_SEED = 0xC0FFEE
+BENCH_INDEX_CACHE = os.path.join(tempfile.gettempdir(), 'techscope_bench_index_v3.json')
+BENCH_METADATA_CACHE = os.path.join(tempfile.gettempdir(), 'techscope_bench_metadata_v3.json')
+
+# Calls per timed measurement; the first is a discarded warmup
+TIMING_TRIALS = 11
+NS_PER_SECOND = 1_000_000_000
+
+def _time_ns(fn, *args, **kwargs):
+    """Call fn once and return (elapsed nanoseconds, result)."""
+    start = time.perf_counter_ns()
+    result = fn(*args, **kwargs)
+    return time.perf_counter_ns() - start, result
+
+@contextmanager
+def _gc_paused():
+    """Collect garbage up front, then keep the collector off for a timed block."""
+    was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+def _median_time_ns(fn, *args, **kwargs):
+    """Return (median elapsed nanoseconds, last result) over TIMING_TRIALS calls."""
+    timings = []
+    for _ in range(TIMING_TRIALS):
+        elapsed, result = _time_ns(fn, *args, **kwargs)
+        timings.append(elapsed)
+    return statistics.median(timings[1:]), result
+
+# Query instance owned by each process-pool worker
+_worker_query = None
+
+def _init_search_worker(index_dir):
+    """Build each worker's Query over the memory-mapped index in index_dir."""
+    global _worker_query
+    _worker_query = Query(index_dir=index_dir, cache_size=0)
+    # Load (map) the index now, outside the timed searches
+    _worker_query.load_index()
+
+def _worker_uses_mapped_postings():
+    """Return whether this worker's postings are read from the shared mapping."""
+    return isinstance(_worker_query.inverted_index, MappedInvertedIndex)
+
+def _search_in_worker(query, max_results):
+    """Run one search in a worker process, returning (elapsed ns, doc ids)."""
+    elapsed_ns, results = _time_ns(_worker_query.search, query, max_results=max_results)
+    return elapsed_ns, [r['doc_id'] for r in results]
 
 class TestPerformance(unittest.TestCase):
     
-    def setUp(self):
-        """Set up test fixtures before each test method."""
+    # Concurrent search load
+    NUM_THREADS = 10
+    SEARCHES_PER_THREAD = 5
+    
+    # Common search terms used by test_search_speed
+    SPEED_QUERIES = [
+        "python programming",
+        "machine learning",
+        "web development",
+        "data science",
+        "javascript"
+    ]
+    
+    @classmethod
+    def setUpClass(cls):
+        """Build the large index once and share it across test methods."""
         # Create temporary directories
-        self.test_dir = tempfile.mkdtemp()
-        self.index_dir = os.path.join(self.test_dir, 'index')
-        os.makedirs(self.index_dir)
+        cls.test_dir = tempfile.mkdtemp()
+        cls.index_dir = os.path.join(cls.test_dir, 'index')
+        os.makedirs(cls.index_dir)
         
         # Create large test dataset
-        self.create_large_test_index()
-        
-        # Create query instance
-        self.query = Query(index_dir=self.index_dir)
+        cls.create_large_test_index()
+        
+        # Create query instance (searches are read-only, so it is shared);
+        # the result cache is off so repeated queries time the search itself
+        cls.query = Query(index_dir=cls.index_dir, cache_size=0)
+        
+        # Warm up once so the index files are loaded before any timed search
+        cls.query.search("warmup", max_results=1)
+        
+        # Move the loaded index out of the collector's view so later
+        # collections don't rescan it. Cleanups are registered as each piece
+        # of process-wide state changes, so it is restored for the tests that
+        # run after this class even if setUpClass fails part way
+        gc.collect()
+        gc.freeze()
+        cls.addClassCleanup(gc.unfreeze)
+        
+        # Pin to a fixed CPU set so wall-clock bounds don't depend on where
+        # the scheduler happens to place the workers
+        saved_affinity = cls.pin_cpus(cls.NUM_THREADS)
+        if saved_affinity is not None:
+            cls.addClassCleanup(os.sched_setaffinity, 0, saved_affinity)
+        
+        # Worker pool reused by the concurrency tests
+        cls._pool = ThreadPoolExecutor(max_workers=cls.NUM_THREADS)
+        cls.addClassCleanup(cls._pool.shutdown)
     
-    def create_large_test_index(self):
+    @staticmethod
+    def pin_cpus(num_cpus):
+        """Pin this process to its first num_cpus allowed CPUs.
+        
+        Returns the previous affinity set, or None if pinning is not
+        supported (non-Linux) or not permitted.
+        """
+        if not (sys.platform.startswith('linux') and hasattr(os, 'sched_setaffinity')):
+            return None
+        
+        try:
+            saved = os.sched_getaffinity(0)
+            os.sched_setaffinity(0, sorted(saved)[:num_cpus])
+        except OSError:
+            return None
+        return saved
+    
+    @classmethod
+    def create_large_test_index(cls):
         """Create a large test index for performance testing."""
         # Generate large inverted index
         num_documents = 1000
         num_terms = 5000
         
+        # Use a private, seeded generator so every run builds the same index
+        # and the serialized files can be reused across runs
+        rng = random.Random(BENCH_SEED)
+        cls.rng = rng
+        
         # Generate random terms
-        terms = [''.join(random.choices(string.ascii_lowercase, k=random.randint(3, 10))) 
+        alphabet = string.ascii_lowercase
+        terms = [''.join(rng.choices(alphabet, k=rng.randint(3, 10))) 
                 for _ in range(num_terms)]
         
-        # Generate inverted index
+        # Pre-generate random 2-3 word queries so no timed region pays for
+        # building them; drawn before the cache check so they are the same
+        # whether or not the index is regenerated
+        cls._random_queries = [' '.join(rng.sample(terms, rng.randint(2, 3))) 
+                              for _ in range(20)]
+        
+        # One interned two-term query per concurrent search slot
+        cls._concurrent_queries = [sys.intern(' '.join(rng.sample(terms, 2)))
+                                  for _ in range(cls.NUM_THREADS * cls.SEARCHES_PER_THREAD)]
+        
+        if not (os.path.exists(BENCH_INDEX_CACHE) and os.path.exists(BENCH_METADATA_CACHE)):
+            inverted_index, document_metadata = cls.generate_large_test_index(rng, terms, num_documents)
+            cls.write_cache_file(BENCH_INDEX_CACHE, inverted_index)
+            cls.write_cache_file(BENCH_METADATA_CACHE, document_metadata)
+        
+        # Copy the cached index files into the test index directory
+        shutil.copy(BENCH_INDEX_CACHE, os.path.join(cls.index_dir, 'inverted_index.json'))
+        shutil.copy(BENCH_METADATA_CACHE, os.path.join(cls.index_dir, 'document_metadata.json'))
+        
+        # Store for reference
+        cls.test_terms = terms
+        cls.test_documents = [f'doc{i}.html' for i in range(num_documents)]
+    
+    @staticmethod
+    def generate_large_test_index(rng, terms, num_documents):
+        """Generate the inverted index and document metadata for the given terms."""
+        # Draw all posting-list lengths and scores up front: each term
+        # appears in 1-20 random documents
+        num_terms = len(terms)
+        counts = rng.choices(range(1, 21), k=num_terms)
+        offsets = [0, *accumulate(counts)]
+        all_scores = [round(0.1 + 1.9 * rng.random(), 3) for _ in range(offsets[-1])]
+        
+        # Build each document id string once and share it between the
+        # postings and the metadata
+        doc_ids = [sys.intern(f'doc{i}.html') for i in range(num_documents)]
+        
+        # Generate inverted index, slicing each term's scores by offset
+        documents = range(num_documents)
         inverted_index = {}
-        for term in terms:
-            # Each term appears in 1-20 random documents
-            num_docs = random.randint(1, 20)
-            doc_ids = [f'doc{i}.html' for i in random.sample(range(num_documents), num_docs)]
-            scores = {doc_id: round(random.uniform(0.1, 2.0), 3) for doc_id in doc_ids}
-            inverted_index[term] = scores
+        for term, start, end in zip(terms, offsets, offsets[1:]):
+            posting_ids = [doc_ids[i] for i in rng.sample(documents, end - start)]
+            inverted_index[term] = dict(zip(posting_ids, all_scores[start:end]))
         
         # Generate document metadata
         document_metadata = {}
         for i in range(num_documents):
-            doc_id = f'doc{i}.html'
+            doc_id = doc_ids[i]
             document_metadata[doc_id] = {
-                'title': f'Document {i} - {random.choice(terms)}',
+                'title': f'Document {i} - {rng.choice(terms)}',
                 'url': f'http://example.com/doc{i}',
                 'timestamp': 1703123456.789 + i,
                 'author': f'Author {i % 100}',
-                'category': random.choice(['Programming', 'Web Development', 'AI', 'Data Science'])
+                'category': rng.choice(['Programming', 'Web Development', 'AI', 'Data Science'])
             }
         
-        # Save test index files
-        index_file = os.path.join(self.index_dir, 'inverted_index.json')
-        with open(index_file, 'w', encoding='utf-8') as f:
-            json.dump(inverted_index, f, indent=2)
-        
-        metadata_file = os.path.join(self.index_dir, 'document_metadata.json')
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(document_metadata, f, indent=2)
-        
-        # Store for reference
-        self.test_terms = terms
-        self.test_documents = list(document_metadata.keys())
+        return inverted_index, document_metadata
+    
+    @staticmethod
+    def write_cache_file(path, data):
+        """Write data to a cache file atomically so concurrent runs never see partial JSON."""
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(data, separators=(',', ':')))
+        os.replace(tmp_path, path)
     
     def test_search_speed(self):
         """Test search response time with large dataset."""
         # Test with common search terms
-        test_queries = [
-            "python programming",
-            "machine learning",
-            "web development",
-            "data science",
-            "javascript"
-        ]
-        
-        for query in test_queries:
-            with self.subTest(query=query):
-                start_time = time.time()
-                results = self.query.search(query, max_results=10)
-                end_time = time.time()
-                
-                response_time = end_time - start_time
+        for query in self.SPEED_QUERIES:
+            with self.subTest(query=query), _gc_paused():
+                response_ns, results = _median_time_ns(self.query.search, query, max_results=10)
+                response_time = response_ns / NS_PER_SECOND
                 
                 # Performance assertions
-                self.assertLess(response_time, 2.0, f"Search for '{query}' took {response_time:.3f}s, should be under 2s")
+                self.assertLess(response_ns, 2 * NS_PER_SECOND, f"Search for '{query}' took {response_time:.3f}s, should be under 2s")
                 self.assertIsInstance(results, list)
                 
                 print(f"Query: '{query}' - Time: {response_time:.3f}s - Results: {len(results)}")
     
+    def _assert_nonincreasing(self, seq):
+        """Assert seq is sorted highest first, showing the whole sequence on failure."""
+        self.assertEqual(seq, sorted(seq, reverse=True))
+    
     def test_large_result_set(self):
         """Test handling large result sets."""
         # Search for a term that appears in many documents
@@ -106,38 +259,23 @@ class TestPerformance(unittest.TestCase):
         self.assertLessEqual(len(results), 100, "Should respect max_results limit")
         
         # Should be sorted by score
-        if len(results) > 1:
-            for i in range(len(results) - 1):
-                self.assertGreaterEqual(
-                    results[i]['score'], 
-                    results[i + 1]['score'],
-                    "Results should be sorted by score (highest first)"
-                )
+        self._assert_nonincreasing([r['score'] for r in results])
     
     def test_multiple_searches_performance(self):
         """Test performance of multiple searches in sequence."""
-        # Generate random search queries
-        random_queries = []
-        for _ in range(20):
-            # Create random 2-3 word queries
-            num_words = random.randint(2, 3)
-            query_words = random.sample(self.test_terms, num_words)
-            random_queries.append(' '.join(query_words))
-        
         total_time = 0
         successful_searches = 0
         
-        for query in random_queries:
-            start_time = time.time()
+        for query in self._random_queries:
             try:
-                results = self.query.search(query, max_results=5)
-                end_time = time.time()
+                with _gc_paused():
+                    elapsed_ns, results = _time_ns(self.query.search, query, max_results=5)
                 
-                total_time += (end_time - start_time)
+                individual_time = elapsed_ns / NS_PER_SECOND
+                total_time += individual_time
                 successful_searches += 1
                 
                 # Each individual search should be fast
-                individual_time = end_time - start_time
                 self.assertLess(individual_time, 1.0, f"Individual search took {individual_time:.3f}s")
                 
             except Exception as e:
@@ -152,89 +290,70 @@ class TestPerformance(unittest.TestCase):
             self.assertLess(avg_time, 0.5, f"Average search time {avg_time:.3f}s is too slow")
     
     def test_memory_usage(self):
-        """Test memory usage during searches."""
-        import psutil
-        import os
-        
-        # Get initial memory usage
-        process = psutil.Process(os.getpid())
-        initial_memory = process.memory_info().rss / 1024 / 1024  # MB
-        
-        # Perform multiple searches
-        for i in range(50):
-            query = f"search term {i}"
-            results = self.query.search(query, max_results=10)
+        """Test memory retained by Python allocations across searches."""
+        # Use queries made of indexed terms so every search walks real
+        # posting lists instead of short-circuiting on unknown terms
+        tracemalloc.start()
+        try:
+            snapshot_before = tracemalloc.take_snapshot()
+            
+            for query in self._concurrent_queries:
+                results = self.query.search(query, max_results=10)
+            
+            snapshot_after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
         
-        # Get final memory usage
-        final_memory = process.memory_info().rss / 1024 / 1024  # MB
-        memory_increase = final_memory - initial_memory
+        stats = snapshot_after.compare_to(snapshot_before, 'filename')
+        memory_increase = sum(stat.size_diff for stat in stats) / 1024 / 1024  # MB
         
-        print(f"Memory usage - Initial: {initial_memory:.1f}MB, Final: {final_memory:.1f}MB, Increase: {memory_increase:.1f}MB")
+        print(f"Memory usage - Increase: {memory_increase:.3f}MB")
         
-        # Memory increase should be reasonable (less than 100MB)
-        self.assertLess(memory_increase, 100, f"Memory increase {memory_increase:.1f}MB is too high")
+        # Memory retained by searches should be small (less than 10MB)
+        self.assertLess(memory_increase, 10, f"Memory increase {memory_increase:.3f}MB is too high")
     
     def test_concurrent_search_performance(self):
         """Test performance under concurrent search load."""
-        import threading
-        import queue
-        
-        # Test parameters
-        num_threads = 10
-        searches_per_thread = 5
+        num_threads = self.NUM_THREADS
+        searches_per_thread = self.SEARCHES_PER_THREAD
         
-        # Queue for results
-        result_queue = queue.Queue()
-        error_queue = queue.Queue()
+        # Each worker owns exactly one slot, so appends need no locking
+        local_results = [[] for _ in range(num_threads)]
+        local_errors = [[] for _ in range(num_threads)]
         
         def search_worker(thread_id):
-            """Worker function for concurrent searches."""
-            for i in range(searches_per_thread):
-                query = f"thread{thread_id}_search{i}"
-                start_time = time.time()
-                
+            """Worker function running one thread's batch of searches."""
+            for search_id in range(searches_per_thread):
+                query = self._concurrent_queries[thread_id * searches_per_thread + search_id]
                 try:
-                    results = self.query.search(query, max_results=5)
-                    end_time = time.time()
-                    
-                    result_queue.put({
-                        'thread_id': thread_id,
-                        'search_id': i,
-                        'time': end_time - start_time,
-                        'results_count': len(results)
-                    })
-                    
+                    elapsed_ns, search_results = _time_ns(self.query.search, query, max_results=5)
                 except Exception as e:
-                    error_queue.put({
+                    local_errors[thread_id].append({
                         'thread_id': thread_id,
-                        'search_id': i,
+                        'search_id': search_id,
                         'error': str(e)
                     })
+                    continue
+                
+                local_results[thread_id].append({
+                    'thread_id': thread_id,
+                    'search_id': search_id,
+                    'time': elapsed_ns / NS_PER_SECOND,
+                    'results_count': len(search_results)
+                })
+        
+        with _gc_paused():
+            # Submit one batch per thread to the shared pool
+            start_ns = time.perf_counter_ns()
+            
+            futures = [self._pool.submit(search_worker, i) for i in range(num_threads)]
+            for future in futures:
+                future.result()
+            
+            total_time = (time.perf_counter_ns() - start_ns) / NS_PER_SECOND
         
-        # Start threads
-        threads = []
-        start_time = time.time()
-        
-        for i in range(num_threads):
-            thread = threading.Thread(target=search_worker, args=(i,))
-            threads.append(thread)
-            thread.start()
-        
-        # Wait for all threads to complete
-        for thread in threads:
-            thread.join()
-        
-        end_time = time.time()
-        total_time = end_time - start_time
-        
-        # Collect results
-        results = []
-        while not result_queue.empty():
-            results.append(result_queue.get())
-        
-        errors = []
-        while not error_queue.empty():
-            errors.append(error_queue.get())
+        results = [r for sub in local_results for r in sub]
+        errors = [e for sub in local_errors for e in sub]
         
         # Performance assertions
         expected_searches = num_threads * searches_per_thread
@@ -256,16 +375,61 @@ class TestPerformance(unittest.TestCase):
             avg_search_time = sum(r['time'] for r in results) / len(results)
             self.assertLess(avg_search_time, 1.0, f"Average search time {avg_search_time:.3f}s is too slow")
     
+    def test_multiprocess_search_performance(self):
+        """Test parallel searches across processes sharing one memory-mapped postings file."""
+        queries = self._random_queries * 5
+        
+        # Write the postings once as terms.json + postings.bin; every worker
+        # maps the same file, so the postings pages live once in the OS page
+        # cache instead of being parsed into each worker's heap
+        shared_dir = os.path.join(self.test_dir, 'mapped_index')
+        write_mapped_index(shared_dir, self.query.inverted_index)
+        for name in ('inverted_index.json', 'document_metadata.json'):
+            shutil.copy(os.path.join(self.index_dir, name), shared_dir)
+        num_workers = min(os.cpu_count() or 1, self.NUM_THREADS)
+        
+        # Spawned workers start clean: no locks inherited from this
+        # process's threads (the class thread pool is alive during this test)
+        start_ns = time.perf_counter_ns()
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_search_worker,
+            initargs=(shared_dir,)
+        ) as pool:
+            outcomes = list(pool.map(_search_in_worker, queries, [5] * len(queries)))
+            uses_mapped_postings = pool.submit(_worker_uses_mapped_postings).result()
+        total_time = (time.perf_counter_ns() - start_ns) / NS_PER_SECOND
+        
+        self.assertTrue(uses_mapped_postings)
+        print(f"Multiprocess test - Workers: {num_workers}, Total time: {total_time:.3f}s")
+        
+        # Workers must rank exactly like the in-process query engine
+        for query, (elapsed_ns, doc_ids) in zip(queries, outcomes):
+            expected = [r['doc_id'] for r in self.query.search(query, max_results=5)]
+            self.assertEqual(doc_ids, expected, f"Worker results differ for '{query}'")
+        
+        avg_search_time = sum(elapsed_ns for elapsed_ns, _ in outcomes) / len(outcomes) / NS_PER_SECOND
+        self.assertLess(total_time, 30, f"Total time {total_time:.3f}s is too slow")
+        self.assertLess(avg_search_time, 1.0, f"Average search time {avg_search_time:.3f}s is too slow")
+    
+    def test_index_loaded_once(self):
+        """Test that searches reuse the index loaded during warmup."""
+        with mock.patch.object(Indexer, 'load_index_metadata') as load_index_metadata:
+            for query in ["python programming", "machine learning", "web development"]:
+                self.query.search(query, max_results=5)
+            self.query.get_search_stats()
+        
+        load_index_metadata.assert_not_called()
+    
     def test_search_stats_performance(self):
         """Test performance of search statistics."""
-        start_time = time.time()
-        stats = self.query.get_search_stats()
-        end_time = time.time()
-        
-        stats_time = end_time - start_time
+        with _gc_paused():
+            stats_ns, stats = _median_time_ns(self.query.get_search_stats)
+        stats_time = stats_ns / NS_PER_SECOND
         
         # Should be very fast
-        self.assertLess(stats_time, 0.1, f"Stats calculation took {stats_time:.3f}s, should be under 0.1s")
+        self.assertLess(stats_ns, NS_PER_SECOND // 10, f"Stats calculation took {stats_time:.3f}s, should be under 0.1s")
         
         # Check stats structure
         self.assertIsInstance(stats, dict)
@@ -274,9 +438,11 @@ class TestPerformance(unittest.TestCase):
         
         print(f"Search stats - Time: {stats_time:.3f}s, Documents: {stats['total_documents']}, Terms: {stats['total_terms']}")
     
-    def tearDown(self):
-        """Clean up after each test."""
-        shutil.rmtree(self.test_dir)
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after all tests have run."""
+        # The GC, affinity and pool cleanups registered in setUpClass run next
+        shutil.rmtree(cls.test_dir)
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
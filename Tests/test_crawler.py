@@ -0,0 +1,125 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import json
+from unittest import mock
+
+import responses
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from crawler.crawler import Crawler
+from index.indexer import Indexer
+
+# Small fake site: every page links to the next two pages
+SITE = {
+    f'http://example.com/page{i}': (
+        f'<html><head><title>Page {i}</title></head><body>'
+        f'<a href="/page{i + 1}">next</a> <a href="/page{i + 2}#top">skip</a>'
+        f'</body></html>'
+    )
+    for i in range(30)
+}
+SITE['http://example.com'] = '<html><body><a href="/page0">start</a></body></html>'
+
+def fake_fetch(url):
+    html = SITE.get(url)
+    return (html, 200) if html else (None, None)
+
+class TestCrawler(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a crawler writing into a temporary directory."""
+        self.data_dir = tempfile.mkdtemp()
+        self.crawler = Crawler(['http://example.com'], max_pages=10, data_dir=self.data_dir,
+                               crawl_delay=0, max_workers=4)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.data_dir)
+
+    def test_start_crawling_respects_max_pages(self):
+        """Test that batched crawling stops at max_pages."""
+        with mock.patch.object(self.crawler, 'fetch_html', side_effect=fake_fetch) as fetch:
+            self.crawler.start_crawling()
+
+        self.assertEqual(fetch.call_count, 10)
+        self.assertEqual(len(self.crawler.visited), 10)
+        html_files = [f for f in os.listdir(self.data_dir) if f.endswith('.html')]
+        self.assertEqual(len(html_files), 10)
+
+    def test_start_crawling_fetches_each_url_once(self):
+        """Test that duplicate links within a batch are fetched only once."""
+        with mock.patch.object(self.crawler, 'fetch_html', side_effect=fake_fetch) as fetch:
+            self.crawler.start_crawling()
+
+        fetched = [self.crawler.normalize_url(call.args[0]) for call in fetch.call_args_list]
+        self.assertEqual(len(fetched), len(set(fetched)))
+
+    def test_seed_with_query_string_fetched_as_given(self):
+        """Test that a seed URL keeps its query string when fetched and saved."""
+        seed = 'http://example.com/search?q=python'
+        crawler = Crawler([seed], max_pages=1, data_dir=self.data_dir, crawl_delay=0, max_workers=4)
+        with mock.patch.object(crawler, 'fetch_html', return_value=(SITE['http://example.com/page0'], 200)) as fetch:
+            crawler.start_crawling()
+
+        fetch.assert_called_once_with(seed)
+        self.assertIn(crawler.normalize_url(seed), crawler.visited)
+        with open(os.path.join(self.data_dir, 'metadata.jsonl'), encoding='utf-8') as f:
+            self.assertEqual(json.loads(f.readline())['original_url'], seed)
+
+    def test_failed_fetch_marked_visited(self):
+        """Test that pages that fail to fetch are not retried."""
+        with mock.patch.object(self.crawler, 'fetch_html', return_value=(None, None)) as fetch:
+            self.crawler.start_crawling()
+
+        fetch.assert_called_once_with('http://example.com')
+        self.assertIn('http://example.com', self.crawler.visited)
+
+    def test_metadata_jsonl_read_by_indexer(self):
+        """Test that crawl metadata lands in metadata.jsonl and reaches the indexer."""
+        with mock.patch.object(self.crawler, 'fetch_html', side_effect=fake_fetch):
+            self.crawler.start_crawling()
+
+        self.assertFalse([f for f in os.listdir(self.data_dir) if f.endswith('.meta')])
+        with open(os.path.join(self.data_dir, 'metadata.jsonl'), encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 10)
+
+        indexer = Indexer(data_dir=self.data_dir)
+        processed = indexer.process_documents(indexer.load_crawled_data())
+        urls = {doc['metadata']['url'] for doc in processed.values()}
+        self.assertEqual(len(processed), 10)
+        self.assertIn('http://example.com', urls)
+        self.assertNotIn('No URL', urls)
+
+    def test_save_page_flushes_metadata(self):
+        """Test that each metadata record is readable before the crawler is closed."""
+        metadata_path = os.path.join(self.data_dir, 'metadata.jsonl')
+        with Crawler([], max_pages=10, data_dir=self.data_dir) as crawler:
+            for url in ('http://example.com/page0', 'http://example.com/page1'):
+                self.assertTrue(crawler.save_page(url, SITE[url], 200))
+                with open(metadata_path, encoding='utf-8') as f:
+                    self.assertEqual(json.loads(f.readlines()[-1])['original_url'], url)
+
+        self.assertIsNone(crawler._meta_fp)
+
+    @responses.activate
+    def test_fetch_html_reuses_session(self):
+        """Test that fetches go through the crawler's session with its headers."""
+        responses.add(responses.GET, 'http://example.com/page0', body=SITE['http://example.com/page0'])
+        responses.add(responses.GET, 'http://example.com/page1', body=SITE['http://example.com/page1'])
+
+        with mock.patch('requests.get') as module_get:
+            self.assertEqual(self.crawler.fetch_html('http://example.com/page0'),
+                             (SITE['http://example.com/page0'], 200))
+            self.crawler.fetch_html('http://example.com/page1')
+
+        module_get.assert_not_called()
+        for call in responses.calls:
+            self.assertTrue(call.request.headers['User-Agent'].startswith('Mozilla/5.0'))
+
+if __name__ == '__main__':
+    unittest.main()
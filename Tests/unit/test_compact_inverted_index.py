@@ -0,0 +1,57 @@
+import unittest
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from index.inverted_indexer import CompactInvertedIndex
+
+class TestCompactInvertedIndex(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.test_inverted_index = {
+            'python': {
+                'doc3.html': 0.92,
+                'doc1.html': 0.85
+            },
+            'programming': {
+                'doc1.html': 0.67,
+                'doc2.html': 0.78
+            },
+            'javascript': {
+                'doc2.html': 0.88
+            }
+        }
+        
+        self.index = CompactInvertedIndex(self.test_inverted_index)
+    
+    def test_lookup_matches_source(self):
+        """Test that postings round-trip with exact scores and order"""
+        for term, documents in self.test_inverted_index.items():
+            self.assertEqual(self.index[term], documents)
+            self.assertEqual(list(self.index[term]), list(documents))
+    
+    def test_mapping_interface(self):
+        """Test membership, iteration and length"""
+        self.assertIn('python', self.index)
+        self.assertNotIn('java', self.index)
+        self.assertEqual(list(self.index), ['python', 'programming', 'javascript'])
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index, self.test_inverted_index)
+    
+    def test_missing_term(self):
+        """Test that unknown terms raise KeyError like a dict"""
+        with self.assertRaises(KeyError):
+            self.index['java']
+        self.assertIsNone(self.index.get('java'))
+    
+    def test_doc_ids_shared(self):
+        """Test that each doc id is stored once"""
+        self.assertEqual(sorted(self.index.doc_ids), ['doc1.html', 'doc2.html', 'doc3.html'])
+        self.assertEqual(self.index.posting_count('python'), 2)
+        self.assertEqual(self.index.posting_count('javascript'), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from index.document_table import DocumentTable
+
+class TestDocumentTable(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.test_metadata = {
+            'doc1.html': {
+                'title': 'Python Guide',
+                'url': 'http://example.com/1',
+                'processed_tokens': 150,
+                'processing_timestamp': 1703123456.789
+            },
+            'doc2.html': {
+                'url': 'http://example.com/2',
+                'title': 'JS Tutorial',
+                'processed_tokens': 80,
+                'processing_timestamp': 1703123500.123
+            },
+            'doc3.html': {
+                'title': 'Sparse',
+                'processing_timestamp': 1703123550.456
+            },
+            'doc4.html': {}
+        }
+        
+        self.table = DocumentTable(self.test_metadata)
+    
+    def test_lookup_matches_source(self):
+        """Test that rows rebuild the original dicts, field order included"""
+        for doc_id, metadata in self.test_metadata.items():
+            self.assertEqual(self.table[doc_id], metadata)
+            self.assertEqual(list(self.table[doc_id]), list(metadata))
+    
+    def test_mapping_interface(self):
+        """Test membership, iteration, length and get"""
+        self.assertIn('doc3.html', self.table)
+        self.assertNotIn('missing.html', self.table)
+        self.assertEqual(list(self.table), list(self.test_metadata))
+        self.assertEqual(len(self.table), 4)
+        self.assertIsNone(self.table.get('missing.html'))
+    
+    def test_numeric_columns_packed(self):
+        """Test that uniform numeric columns are raw arrays"""
+        table = DocumentTable({doc_id: self.test_metadata[doc_id] for doc_id in ('doc1.html', 'doc2.html')})
+        self.assertEqual(table.columns['processing_timestamp'].typecode, 'd')
+        self.assertEqual(table.columns['processed_tokens'].typecode, 'q')
+        self.assertIsInstance(table.columns['title'], list)
+        
+        # Missing in some rows, so it stays a list
+        self.assertIsInstance(self.table.columns['processing_timestamp'], list)
+    
+    def test_field(self):
+        """Test reading one field without rebuilding the row"""
+        self.assertEqual(self.table.field('doc2.html', 'title'), 'JS Tutorial')
+        self.assertIsNone(self.table.field('doc3.html', 'url'))
+        self.assertEqual(self.table.field('missing.html', 'url', 'No URL'), 'No URL')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import sys
+import os
+import tempfile
+import io
+import json
+import shutil
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from index.inverted_indexer import (InvertedIndex, CompactInvertedIndex, MappedInvertedIndex,
+                                    write_compact_json, write_mapped_index, JSON_WRITE_CHUNK,
+                                    MAPPED_POSTINGS_FILE)
+
+class TestInvertedIndex(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up an index built from two documents."""
+        self.test_dir = tempfile.mkdtemp()
+        self.index = InvertedIndex()
+        self.index.build_index({
+            'doc1.html': {'python': 0.85, 'programming': 0.67},
+            'doc2.html': {'programming': 0.78, 'javascript': 0.1 + 0.2}
+        })
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.test_dir)
+    
+    def test_index_stats_size_estimate(self):
+        """Test the size estimate and that it follows every change to the index"""
+        stats = self.index.get_index_stats()
+        self.assertEqual(stats['total_terms'], 3)
+        # 'python' + 'programming' + 'javascript', doc ids, 8 bytes per score
+        self.assertEqual(stats['index_size_bytes'], 6 + 11 + 10 + 4 * 9 + 4 * 8)
+        
+        self.index.add_document('doc10.html', {'python': 0.5})
+        self.assertEqual(self.index.get_index_stats()['index_size_bytes'], stats['index_size_bytes'] + 10 + 8)
+        
+        # Direct edits to .index are reflected too
+        self.index.index['rust'] = {'doc3.html': 0.4}
+        del self.index.index['python']['doc1.html']
+        self.assertEqual(self.index.get_index_stats()['index_size_bytes'],
+                         stats['index_size_bytes'] + 10 + 8 + 4 + 9 + 8 - 9 - 8)
+    
+    def test_json_round_trip(self):
+        """Test that the compact JSON file loads back to the same index"""
+        filename = os.path.join(self.test_dir, 'index', 'inverted_index.json')
+        self.index.save_to_file(filename)
+        
+        loaded = InvertedIndex()
+        self.assertTrue(loaded.load_from_file(filename))
+        self.assertEqual(loaded.index, self.index.index)
+        with open(filename, encoding='utf-8') as f:
+            self.assertNotIn('\n', f.read())
+    
+    def test_write_compact_json_matches_dumps(self):
+        """Test that sliced writing produces exactly json.dumps' compact output"""
+        for size in (0, 1, JSON_WRITE_CHUNK, 2 * JSON_WRITE_CHUNK + 3):
+            with self.subTest(size=size):
+                mapping = {f'term{i}': {'doc1.html': i / 7} for i in range(size)}
+                buffer = io.StringIO()
+                write_compact_json(buffer, mapping)
+                self.assertEqual(buffer.getvalue(), json.dumps(mapping, separators=(',', ':')))
+    
+    def test_mapped_round_trip(self):
+        """Test that the mapped index gives the same postings as the compact index"""
+        index_dir = os.path.join(self.test_dir, 'mapped')
+        write_mapped_index(index_dir, self.index.index)
+        mapped = MappedInvertedIndex(index_dir)
+        compact = CompactInvertedIndex(self.index.index)
+        
+        self.assertEqual(list(mapped), list(compact))
+        for term in compact:
+            self.assertEqual(list(mapped[term].items()), list(compact[term].items()))
+            self.assertEqual(mapped.posting_count(term), compact.posting_count(term))
+        self.assertNotIn('missing', mapped)
+        # Odd posting counts are padded, so every score block stays 8-byte aligned
+        for offset, count in mapped.postings.terms.values():
+            self.assertEqual(offset % 8, 0)
+        
+        # Rewriting keeps the open map readable and the new files load fresh
+        write_mapped_index(index_dir, {'python': {'doc3.html': 0.5}})
+        self.assertEqual(mapped['python'], {'doc1.html': 0.85})
+        self.assertEqual(dict(MappedInvertedIndex(index_dir).items()), {'python': {'doc3.html': 0.5}})
+        
+        write_mapped_index(index_dir, {})
+        self.assertEqual(len(MappedInvertedIndex(index_dir)), 0)
+    
+    def test_mapped_rejects_mismatched_files(self):
+        """Test that terms.json is never paired with another build's postings.bin"""
+        index_dir = os.path.join(self.test_dir, 'mapped')
+        postings_file = os.path.join(index_dir, MAPPED_POSTINGS_FILE)
+        write_mapped_index(index_dir, self.index.index)
+        shutil.copy(postings_file, postings_file + '.old')
+        
+        # Same shape, different build: only the generation id differs
+        write_mapped_index(index_dir, self.index.index)
+        shutil.copy(postings_file + '.old', postings_file)
+        with self.assertRaises(ValueError):
+            MappedInvertedIndex(index_dir)
+        
+        # Truncated postings
+        write_mapped_index(index_dir, self.index.index)
+        with open(postings_file, 'r+b') as f:
+            f.truncate(os.path.getsize(postings_file) - 8)
+        with self.assertRaises(ValueError):
+            MappedInvertedIndex(index_dir)
+
+if __name__ == '__main__':
+    unittest.main()
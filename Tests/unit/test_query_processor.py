@@ -1,11 +1,15 @@
 import unittest
 import sys
 import os
+import random
+import re
+from unittest import mock
 
 # Add project root to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from query.query_processor import QueryProcessor
+from index.text_processor import STOPWORDS, NON_ALNUM_RE
 
 class TestQueryProcessor(unittest.TestCase):
     
@@ -38,6 +42,11 @@ class TestQueryProcessor(unittest.TestCase):
         result = self.processor.clean_query("Python 3.9 Programming")
         self.assertEqual(result, "python 39 programming")
     
+    def test_clean_query_hyphenated(self):
+        """Test that hyphens split words and stop words inside them are dropped"""
+        result = self.processor.clean_query("State-of-the-Art don't-stop")
+        self.assertEqual(result, "state art dont stop")
+    
     def test_clean_query_mixed_case(self):
         """Test query with mixed case"""
         result = self.processor.clean_query("PyThOn PrOgRaMmInG")
@@ -77,6 +86,72 @@ class TestQueryProcessor(unittest.TestCase):
         """Test query with only whitespace"""
         result = self.processor.process_query("   ")
         self.assertEqual(result, [])
+    
+    def test_clean_query_removes_whole_stopwords_only(self):
+        """Test stop word removal against a whole-word regex oracle"""
+        stop_re = re.compile(r'\b(?:' + '|'.join(sorted(STOPWORDS, key=len, reverse=True)) + r')\b')
+        vocabulary = sorted(STOPWORDS) + ['theory', 'island', 'a1', 'anthem', 'python', 'it3']
+        rng = random.Random(7)
+        
+        for _ in range(200):
+            text = ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(0, 12)))
+            self.assertEqual(self.processor.clean_query(text), ' '.join(stop_re.sub('', text).split()))
+    
+    def test_clean_query_ascii_fast_path(self):
+        """Test that ASCII queries clean exactly as the regex path would"""
+        every_ascii = ''.join(map(chr, range(128)))
+        rng = random.Random(3)
+        texts = [every_ascii, 'Python 3.9 State-of-the-Art C++ e-mail', 'x\x1fy\x0bz']
+        texts += [''.join(rng.choice(every_ascii) for _ in range(40)) for _ in range(50)]
+        
+        for text in texts:
+            expected = NON_ALNUM_RE.sub('', text.lower().replace('-', ' ')).split()
+            expected = ' '.join(token for token in expected if token not in STOPWORDS)
+            self.assertEqual(self.processor.clean_query(text), expected)
+            # One non-ASCII character (stripped itself) sends the text down the regex path
+            self.assertEqual(self.processor.clean_query(text + ' é'), expected)
+    
+    def test_clean_query_uses_precompiled_patterns(self):
+        """Test that cleaning never goes through the re module's pattern cache"""
+        with mock.patch('index.text_processor.re', side_effect=AssertionError) as re_module:
+            result = self.processor.clean_query("Ünïcode  Python, 3.9 & state-of-the-art!")
+            self.assertEqual(self.processor.clean_query("Python, 3.9!"), "python 39")
+        
+        self.assertEqual(re_module.mock_calls, [])
+        self.assertEqual(result, "ncode python 39 state art")
+    
+    def test_process_query_cache(self):
+        """Test that repeated queries are served from the cache as fresh lists"""
+        first = self.processor.process_query("Python Programming!")
+        first.append('changed')
+        second = self.processor.process_query("Python Programming!")
+        
+        self.assertEqual(second, ['python', 'programming'])
+        info = self.processor.cache_info()
+        self.assertEqual((info.hits, info.misses, info.maxsize), (1, 1, 4096))
+        
+        self.processor.close()
+        self.assertEqual(self.processor.cache_info().currsize, 0)
+        self.assertEqual(self.processor.process_query("Python Programming!"), second)
+        self.assertEqual(self.processor.cache_info().misses, 1)
+        
+        uncached = QueryProcessor(cache_size=0)
+        self.assertEqual(uncached.process_query("Python Programming!"), second)
+        self.assertEqual(uncached.cache_info().currsize, 0)
+    
+    def test_process_queries_matches_process_query(self):
+        """Test that batch processing gives the same tokens as one query at a time"""
+        queries = ["Python programming language", "  JavaScript   &   React  ", "",
+                   "Machine Learning with Python!", "the quick brown fox", "   ", "CAFE\u0301 ΟΔΟΣ",
+                   "\u0301accent first", "State-of-the-Art 3.9"]
+        expected = [self.processor.process_query(query) for query in queries]
+        
+        self.assertEqual(self.processor.process_queries(queries), expected)
+        self.assertEqual(self.processor.process_queries(iter(queries)), expected)
+        # Queries with their own newlines are still cleaned one by one
+        self.assertEqual(self.processor.process_queries(["python\nreact", None, "a\n"]),
+                         [['python', 'react'], [], []])
+        self.assertEqual(self.processor.process_queries([]), [])
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -166,5 +166,36 @@ class TestResultFormatter(unittest.TestCase):
         self.assertEqual(result['author'], 'John Doe')
         self.assertEqual(result['category'], 'Programming')
 
+    def test_add_metadata_does_not_scan_metadata(self):
+        """Test that each result's metadata is fetched by key, never by scanning"""
+        class NoScanDict(dict):
+            def __iter__(self):
+                raise AssertionError('document metadata was scanned')
+            def items(self):
+                raise AssertionError('document metadata was scanned')
+        
+        formatter = ResultFormatter(NoScanDict(self.test_metadata))
+        formatted = formatter.add_metadata({'doc3.html': 0.45, 'unknown_doc.html': 0.1})
+        
+        self.assertEqual(formatted[0]['title'], 'Machine Learning Basics')
+        self.assertEqual(formatted[1], {'doc_id': 'unknown_doc.html', 'score': 0.1})
+    
+    def test_add_metadata_search_fields_win(self):
+        """Test that doc_id and score in metadata never override search values"""
+        formatter = ResultFormatter({
+            'doc1.html': {'title': 'Guide', 'score': 99, 'doc_id': 'stale.html'}
+        })
+        formatted = formatter.add_metadata({'doc1.html': 0.5})
+        
+        self.assertEqual(formatted, [{'doc_id': 'doc1.html', 'score': 0.5, 'title': 'Guide'}])
+        self.assertEqual(list(formatted[0]), ['doc_id', 'score', 'title'])
+    
+    def test_add_metadata_accepts_ranked_pairs(self):
+        """Test that a list of (doc_id, score) pairs keeps its order"""
+        formatted = self.formatter.add_metadata([('doc3.html', 0.9), ('doc1.html', 0.2)])
+        
+        self.assertEqual([r['doc_id'] for r in formatted], ['doc3.html', 'doc1.html'])
+        self.assertEqual(formatted[0]['title'], 'Machine Learning Basics')
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -6,6 +6,8 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from query.search_engine import SearchEngine
+from query.result_formatter import ResultFormatter
+from index.inverted_indexer import CompactInvertedIndex
 
 class TestSearchEngine(unittest.TestCase):
     
@@ -122,6 +124,49 @@ class TestSearchEngine(unittest.TestCase):
             'doc4.html': 0.76   # only javascript
         }
         self.assertEqual(results, expected)
+    
+    def test_search_compact_index_matches_dicts(self):
+        """Test that array-backed postings give the same scores and order as dicts"""
+        compact_engine = SearchEngine(CompactInvertedIndex(self.test_inverted_index), self.test_metadata)
+        queries = [['python'], ['python', 'programming'], ['Machine', 'learning', 'python'],
+                   ['python', 'python'], ['missing'], ['javascript', 'missing', 'programming']]
+        
+        for query in queries:
+            with self.subTest(query=query):
+                expected = self.search_engine.search(query)
+                results = compact_engine.search(query)
+                self.assertEqual(results, expected)
+                self.assertEqual(list(results), list(expected))
+
+    def test_search_top_matches_full_ranking(self):
+        """Test that pruned searches rank the same top results with the same scores"""
+        # One rare high-scoring term, then common terms with tied low scores
+        inverted_index = {
+            'rare': {f'doc{i}': 1.0 + i / 10 for i in range(5)},
+            'common': {f'doc{i}': 0.1 for i in range(100)},
+            'other': {f'doc{i}': 0.05 * (i % 3) for i in range(0, 100, 2)},
+        }
+        formatter = ResultFormatter({})
+        queries = [['rare', 'common'], ['rare', 'common', 'other'], ['common', 'rare'],
+                   ['rare', 'missing', 'other'], ['other']]
+        
+        for index in (inverted_index, CompactInvertedIndex(inverted_index)):
+            engine = SearchEngine(index, {})
+            for query in queries:
+                for max_results in (1, 3, 10, 200):
+                    with self.subTest(index=type(index).__name__, query=query, max_results=max_results):
+                        expected = formatter.format_results(engine.search(query), max_results)
+                        results = formatter.format_results(engine.search(query, max_results), max_results)
+                        self.assertEqual(results, expected)
+        
+        # Documents only in 'common' cannot reach the top 3 after 'rare'
+        self.assertEqual(len(SearchEngine(inverted_index, {}).search(['rare', 'common'], 3)), 5)
+
+    def test_search_top_negative_scores(self):
+        """Test that pruning is skipped when scores can decrease"""
+        inverted_index = {'a': {'doc1': 1.0, 'doc2': 0.9}, 'b': {'doc3': 0.5, 'doc1': -1.0}}
+        engine = SearchEngine(inverted_index, {})
+        self.assertEqual(engine.search(['a', 'b'], 1), engine.search(['a', 'b']))
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -1,22 +1,55 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import lxml.html
 from urllib.parse import urljoin, urlparse
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 import os
+import functools
 import hashlib
 import json
+import logging
 import time
 
+logger = logging.getLogger(__name__)
 
 class Crawler:
-    def __init__(self, seed_urls: List[str], max_pages: int, data_dir='data/pages', crawl_delay=0.005):
+    def __init__(self, seed_urls: List[str], max_pages: int, data_dir='data/pages', crawl_delay=0.005, max_workers=8):
         self.seed_urls = seed_urls
         self.visited = set()
         self.max_pages = max_pages
         self.data_dir = data_dir
         self.crawl_delay = crawl_delay
+        self.max_workers = max_workers
+        # Seeds are queued as given; discovered links are queued normalized
         self.queue = deque(seed_urls)
+        # Normalized URLs ever queued for the current domain; mirrors the
+        # queue for O(1) membership tests (deque lookups are linear)
+        self._enqueued = {self.normalize_url(url) for url in seed_urls}
+        
+        # Page metadata is appended to one JSONL file, opened on first save
+        self.metadata_path = os.path.join(data_dir, 'metadata.jsonl')
+        self._meta_fp = None
+        
+        # Pages are re-encoded as UTF-8 before link extraction
+        self._html_parser = lxml.html.HTMLParser(encoding='utf-8')
+        
+        # One session for the whole crawl so connections to a host are
+        # kept alive and reused; the pool holds a socket per fetch worker
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36'
+        })
+        pool_size = max(32, max_workers)
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         
         # Create data directory if it doesn't exist
         os.makedirs(data_dir, exist_ok=True)
@@ -25,24 +58,20 @@ class Crawler:
     def fetch_html(self, url):
         """Fetch HTML content from URL"""
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.session.get(url, timeout=10)
             response.raise_for_status()
             return response.text, response.status_code
         except requests.RequestException as e:
-            print(f'Error fetching {url}: {e}')
+            logger.warning('Error fetching %s: %s', url, e)
             return None, None
     
 
     def save_page(self, url, html, status_code):
         """Save HTML page to file"""
         try:
-            # Create filename from URL hash
-            url_hash = hashlib.md5(url.encode()).hexdigest()
+            # Create filename from URL hash (128-bit BLAKE2b, same length as MD5)
+            url_hash = hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
             html_filename = f"{self.data_dir}/{url_hash}.html"
-            meta_filename = f"{self.data_dir}/{url_hash}.meta"
 
             metadata = {
                 'original_url': url,
@@ -56,22 +85,35 @@ class Crawler:
             with open(html_filename, 'w', encoding='utf-8') as f:
                 f.write(html)
             
-            # Save metadata
-            with open(meta_filename, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2)
+            # Append metadata as one compact JSON line
+            if self._meta_fp is None:
+                self._meta_fp = open(self.metadata_path, 'a', encoding='utf-8')
+            self._meta_fp.write(json.dumps(metadata, separators=(',', ':')) + '\n')
+            # Each record is on disk once save_page returns, even if the
+            # crawler is never closed
+            self._meta_fp.flush()
             
-            # Only print every 10th page to reduce console spam
-            if len(self.visited) % 10 == 0:
-                print(f'📄 Saved: {url} -> {html_filename}')
+            logger.debug('📄 Saved: %s -> %s', url, html_filename)
             return True
 
         except IOError as e:
-            
-            print(f'Error saving {url}: {e}')
+            logger.error('Error saving %s: %s', url, e)
             return False
 
     def is_valid_link(self, url):
         """Filter out invalid links"""
+        # Fast path for the common case: lowercase http(s) scheme followed by
+        # a host that starts with a letter or digit. Anything else (other
+        # schemes, odd casing, IPv6 brackets) goes through urlparse below.
+        if url.startswith('https://'):
+            host_start = url[8:9]
+        elif url.startswith('http://'):
+            host_start = url[7:8]
+        else:
+            host_start = ''
+        if host_start.isalnum() and '[' not in url and ']' not in url:
+            return True
+
         try:
             parsed_url = urlparse(url)
 
@@ -92,81 +134,147 @@ class Crawler:
 
     def extract_links(self, html, base_url):
         """Extract all links from HTML"""
-        if not html:
+        if not html or html.isspace():
             return []
             
         try:
-            soup = BeautifulSoup(html, 'lxml')
+            root = lxml.html.fromstring(html.encode('utf-8'), parser=self._html_parser)
             links = []
+            is_valid_link = self.is_valid_link
 
-            for link in soup.find_all('a', href=True):
-                href = link['href']
+            for href in root.xpath('//a/@href'):
                 full_url = urljoin(base_url, href)
                 
-                if full_url and self.is_valid_link(full_url):
+                if full_url and is_valid_link(full_url):
                     links.append(full_url)
 
             return links
         except Exception as e:
-            print(f"Error extracting links from {base_url}: {e}")
+            logger.warning('Error extracting links from %s: %s', base_url, e)
             return []
 
     def crawl_page(self, url):
+        html, status_code = self.fetch_html(url)
+        self.process_page(url, html, status_code)
+        
+        # Delay to prevent overwhelming servers
+        time.sleep(self.crawl_delay)
+    
+    def process_page(self, url, html, status_code):
+        """Save a fetched page, queue its links and mark it visited"""
+        normalized_url = self.normalize_url(url)
         try:
-            html, status_code = self.fetch_html(url)
-            
             if not html:
-                print(f"⚠️  Skipping {url} - no content")
-                self.visited.add(self.normalize_url(url))
+                logger.warning('⚠️  Skipping %s - no content', url)
+                self.visited.add(normalized_url)
                 return
 
             self.save_page(url, html, status_code)
             links = self.extract_links(html, url)
 
             for link in links:
-                if link not in self.visited and link not in self.queue:
-                    self.queue.append(self.normalize_url(link))
-            
-            self.visited.add(self.normalize_url(url))
+                normalized = self.normalize_url(link)
+                if normalized not in self.visited and normalized not in self._enqueued:
+                    self._enqueued.add(normalized)
+                    self.queue.append(normalized)
             
-            # Delay to prevent overwhelming servers
-            time.sleep(self.crawl_delay)
+            self.visited.add(normalized_url)
             
         except Exception as e:
-            print(f"⚠️  Error crawling {url}: {e}")
+            logger.warning('⚠️  Error crawling %s: %s', url, e)
             # Mark as visited to avoid infinite retries
-            self.visited.add(self.normalize_url(url))
+            self.visited.add(normalized_url)
             return
     
     def start_crawling(self):
-        print(f"Starting crawler with {len(self.seed_urls)} seed URLs")
-        print(f"Max pages per URL: {self.max_pages}")
+        logger.info('Starting crawler with %d seed URLs', len(self.seed_urls))
+        logger.info('Max pages per URL: %d', self.max_pages)
 
+        try:
+            total_pages = self._crawl_seeds()
+        finally:
+            self.close()
+
+        logger.info('🎉 Crawling complete! Visited %d pages total across all domains', total_pages)
+    
+    def _crawl_seeds(self):
+        """Crawl every seed URL in turn and return the total number of pages crawled"""
         total_pages = 0
         
         for i, seed_url in enumerate(self.seed_urls, 1):
-            print(f"\n🕷️  Crawling {i}/{len(self.seed_urls)}: {seed_url}...")
+            logger.info('🕷️  Crawling %d/%d: %s...', i, len(self.seed_urls), seed_url)
             domain_pages = 0
+            # The seed is fetched exactly as given (query string included);
+            # only the dedup keys are normalized
             self.queue = deque([seed_url])
+            self._enqueued = {self.normalize_url(seed_url)}
             self.visited = set()  # Reset visited for each domain
             
-            while self.queue and domain_pages < self.max_pages:
-                url = self.queue.popleft()
-                if self.normalize_url(url) not in self.visited:
-                    self.crawl_page(url)
-                    domain_pages += 1
-                    total_pages += 1
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                while self.queue and domain_pages < self.max_pages:
+                    batch = self._next_batch(self.max_pages - domain_pages)
+                    if not batch:
+                        break
                     
-                    # Show progress every 20 pages
-                    if domain_pages % 20 == 0:
-                        print(f"   📊 Progress: {domain_pages}/{self.max_pages} pages")
+                    # Fetch the whole batch concurrently; pages are processed
+                    # here, in order, so visited/queue stay single-threaded
+                    futures = [pool.submit(self.fetch_html, url) for url in batch]
+                    for url, future in zip(batch, futures):
+                        try:
+                            html, status_code = future.result()
+                        except Exception as e:
+                            logger.warning('⚠️  Error crawling %s: %s', url, e)
+                            html, status_code = None, None
+                        
+                        self.process_page(url, html, status_code)
+                        domain_pages += 1
+                        total_pages += 1
+                        
+                        # Show progress every 20 pages
+                        if domain_pages % 20 == 0:
+                            logger.info('   📊 Progress: %d/%d pages', domain_pages, self.max_pages)
+                    
+                    # Delay between batches to prevent overwhelming the server
+                    time.sleep(self.crawl_delay)
             
-            print(f"✅ Crawled {domain_pages} pages from {seed_url}")
+            logger.info('✅ Crawled %d pages from %s', domain_pages, seed_url)
 
-        print(f"\n🎉 Crawling complete! Visited {total_pages} pages total across all domains")
+        return total_pages
     
-    def normalize_url(self, url):
-        """Normalize URL to avoid duplicates like example.com/ and example.com"""
+    def close(self):
+        """Flush and close the metadata file and release pooled connections"""
+        if self._meta_fp is not None:
+            self._meta_fp.close()
+            self._meta_fp = None
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _next_batch(self, limit):
+        """Pop up to max_workers unvisited URLs (at most limit) off the queue"""
+        batch = []
+        size = min(self.max_workers, limit)
+        
+        # Queue entries are unique thanks to _enqueued; links are already
+        # normalized, and normalize_url is memoized for the raw seed
+        while self.queue and len(batch) < size:
+            url = self.queue.popleft()
+            if self.normalize_url(url) not in self.visited:
+                batch.append(url)
+        
+        return batch
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=200_000)
+    def normalize_url(url):
+        """Normalize URL to avoid duplicates like example.com/ and example.com
+        
+        Pure function of the URL, so results are memoized across calls.
+        """
         parsed = urlparse(url)
         
         # Remove fragment and query
@@ -0,0 +1,91 @@
+from array import array
+from collections.abc import Mapping
+
+# array typecodes for columns whose every value has exactly this type
+NUMERIC_TYPECODES = {float: 'd', int: 'q'}
+
+
+class DocumentTable(Mapping):
+    """Read-only document metadata stored column by column.
+
+    Each field is one list (or a raw array of doubles/ints) indexed by row,
+    instead of one dict per document. Rows remember which fields they had
+    and in what order, so a lookup rebuilds the document's metadata dict
+    exactly as it was given.
+    """
+
+    def __init__(self, document_metadata):
+        self.doc_ids = []
+        self.rows = {}
+        self.columns = {}
+        self.schemas = []
+        self.row_schemas = array('i')
+        self.irregular = {}
+
+        schema_numbers = {}
+        for doc_id, metadata in document_metadata.items():
+            if not isinstance(metadata, dict):
+                # Not a field mapping; kept as-is outside the columns
+                self.irregular[doc_id] = metadata
+                continue
+
+            row = len(self.doc_ids)
+            self.doc_ids.append(doc_id)
+            self.rows[doc_id] = row
+
+            schema = tuple(metadata)
+            if schema not in schema_numbers:
+                schema_numbers[schema] = len(self.schemas)
+                self.schemas.append(schema)
+            self.row_schemas.append(schema_numbers[schema])
+
+            for field, value in metadata.items():
+                column = self.columns.get(field)
+                if column is None:
+                    column = self.columns[field] = [None] * row
+                elif len(column) < row:
+                    column.extend([None] * (row - len(column)))
+                column.append(value)
+
+        total_rows = len(self.doc_ids)
+        for field, column in self.columns.items():
+            if len(column) < total_rows:
+                column.extend([None] * (total_rows - len(column)))
+            self.columns[field] = self._pack_column(column)
+
+    @staticmethod
+    def _pack_column(column):
+        # Uniform float/int columns hold raw 8-byte values instead of objects
+        value_types = set(map(type, column))
+        if len(value_types) == 1:
+            typecode = NUMERIC_TYPECODES.get(value_types.pop())
+            if typecode is not None:
+                try:
+                    return array(typecode, column)
+                except OverflowError:
+                    pass
+        return column
+
+    def __getitem__(self, doc_id):
+        row = self.rows.get(doc_id)
+        if row is None:
+            return self.irregular[doc_id]
+        columns = self.columns
+        return {field: columns[field][row] for field in self.schemas[self.row_schemas[row]]}
+
+    def __contains__(self, doc_id):
+        return doc_id in self.rows or doc_id in self.irregular
+
+    def __iter__(self):
+        yield from self.doc_ids
+        yield from self.irregular
+
+    def __len__(self):
+        return len(self.doc_ids) + len(self.irregular)
+
+    def field(self, doc_id, name, default=None):
+        """Return one field of a document without rebuilding its dict."""
+        row = self.rows.get(doc_id)
+        if row is None or name not in self.schemas[self.row_schemas[row]]:
+            return default
+        return self.columns[name][row]
@@ -1,32 +1,52 @@
 import json
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from .text_processor import TextProcessor
 from .tfidf_calculator import TFIDFCalculator
-from .inverted_indexer import InvertedIndex
+from .inverted_indexer import InvertedIndex, MappedInvertedIndex, write_compact_json, write_mapped_index
+
+# Below this many documents a process pool costs more than it saves
+MIN_PARALLEL_DOCUMENTS = 64
+
+# Upper bound on documents handed to a pool worker per task
+MAX_PROCESS_CHUNKSIZE = 64
+
+# Indexer owned by each process-pool worker
+_worker_indexer = None
+
+def _init_worker(data_dir):
+    global _worker_indexer
+    _worker_indexer = Indexer(data_dir=data_dir)
+
+def _process_one(task):
+    document, metadata = task
+    return _worker_indexer.process_document(document, metadata)
+
+def process_chunksize(num_tasks, num_workers):
+    # About four tasks per worker: large enough to amortize pickling and
+    # IPC, small enough that a slow chunk doesn't leave workers idle
+    return max(1, min(MAX_PROCESS_CHUNKSIZE, num_tasks // (4 * num_workers)))
 
 class Indexer:
-    def __init__(self, data_dir='data/pages', index_dir='index/data'):
+    def __init__(self, data_dir='data/pages', index_dir='index/data', max_workers=None):
         self.data_dir = data_dir
         self.index_dir = index_dir
+        self.max_workers = max_workers or os.cpu_count() or 1
 
         self.text_processor = TextProcessor()
         self.tfidf_calculator = TFIDFCalculator()
         self.inverted_index = InvertedIndex()
 
     def load_crawled_data(self):
-        documents = []
         try:
-            all_files = os.listdir(self.data_dir)
-            for file in all_files:
-                if file.endswith('.html'):
-                    documents.append(file)
+            with os.scandir(self.data_dir) as entries:
+                return [entry.name for entry in entries if entry.name.endswith('.html')]
         except IOError as e:
             print(f'Error reading directory: {e}')
-        return documents
+            return []
 
     def build_index(self):
-        index = {}
-
         documents = self.load_crawled_data()
         processed_documents = self.process_documents(documents)
 
@@ -34,17 +54,9 @@ class Indexer:
         for doc_id, doc_data in processed_documents.items():
             document_metadata[doc_id] = doc_data['metadata']
 
-        all_tokens = []
-        for doc_tokens in processed_documents.values():
-            all_tokens.append(doc_tokens['tokens'])
-
-        document_count = self.tfidf_calculator.calculate_document_count(all_tokens)
-
-        for doc_id, doc_data in processed_documents.items():
-            term_frequency = self.tfidf_calculator.calculate_term_frequency(doc_data['tokens'])
-            tfidf_scores = self.tfidf_calculator.calculate_tfidf_scores(term_frequency, document_count, len(processed_documents))
-
-            index[doc_id] = tfidf_scores
+        all_tokens = [doc_data['tokens'] for doc_data in processed_documents.values()]
+        tfidf_matrix = self.tfidf_calculator.build_tfidf_matrix(all_tokens)
+        index = dict(zip(processed_documents, tfidf_matrix))
 
         index = self.inverted_index.build_index(index)
 
@@ -52,36 +64,107 @@ class Indexer:
 
         return index
 
+    def load_crawl_metadata(self):
+        """Read the crawler's metadata.jsonl into a dict keyed by doc_id.
+
+        Later lines win, so a page crawled twice keeps its newest record.
+        Returns an empty dict if the file does not exist.
+        """
+        crawl_metadata = {}
+        metadata_path = os.path.join(self.data_dir, 'metadata.jsonl')
+
+        try:
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Skip a partial line left by an interrupted crawl
+                        continue
+                    doc_id = os.path.basename(record.get('filename', '')).replace('.html', '')
+                    crawl_metadata[doc_id] = record
+        except FileNotFoundError:
+            pass
+        except IOError as e:
+            print(f'Error reading {metadata_path}: {e}')
+
+        return crawl_metadata
+
+    def find_meta_files(self):
+        """Map doc_id -> path for per-page .meta files from older crawls, in one directory scan."""
+        try:
+            with os.scandir(self.data_dir) as entries:
+                return {entry.name[:-len('.meta')]: entry.path for entry in entries if entry.name.endswith('.meta')}
+        except OSError as e:
+            print(f'Error reading directory: {e}')
+            return {}
+
     def process_documents(self, documents):
         processed_documents = {}
+        crawl_metadata = self.load_crawl_metadata()
+        meta_files = None
+
+        doc_ids = []
+        tasks = []
         for document in documents:
             if document:
                 doc_id = os.path.basename(document).replace('.html', '')
-                metadata = {}
-
-                meta_path = os.path.join(self.data_dir, document.replace('.html', '.meta'))
+                metadata = crawl_metadata.get(doc_id, {})
+
+                # Fall back to per-page .meta files from older crawls; the
+                # directory is scanned once, and only if some page needs it
+                if not metadata:
+                    if meta_files is None:
+                        meta_files = self.find_meta_files()
+                    meta_path = meta_files.get(doc_id)
+
+                    if meta_path:
+                        try:
+                            with open(meta_path, 'r', encoding='utf-8') as f:
+                                metadata = json.load(f)
+                        except IOError as e:
+                            print(f'Error reading metadata for {doc_id}: {e}')
+
+                doc_ids.append(doc_id)
+                tasks.append((document, metadata))
+
+        # Parsing and tokenizing is CPU-bound and independent per document,
+        # so large batches are spread over worker processes
+        if self.max_workers > 1 and len(tasks) >= MIN_PARALLEL_DOCUMENTS:
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                     initargs=(self.data_dir,)) as pool:
+                chunksize = process_chunksize(len(tasks), self.max_workers)
+                results = list(pool.map(_process_one, tasks, chunksize=chunksize))
+            # Unpickled tokens are fresh strings; intern them again so the
+            # parent shares one object per term across all documents
+            results = [(list(map(sys.intern, result[0])), result[1]) if result is not None else None
+                       for result in results]
+        else:
+            results = [self.process_document(document, metadata) for document, metadata in tasks]
 
-                if os.path.exists(meta_path):
-                    try:
-                        with open(meta_path, 'r', encoding='utf-8') as f:
-                            metadata = json.load(f)
-                    except IOError as e:
-                        print(f'Error reading metadata for {doc_id}: {e}')
-
-                html_path = os.path.join(self.data_dir, document)
-                html_content = self.read_html_file(html_path)
-                if html_content:
-                    tokens, metadata = self.text_processor.process_document(html_content, metadata)
-                    processed_documents[doc_id] = {
-                        'tokens': tokens,
-                        'metadata': metadata,
-                    }
+        for doc_id, result in zip(doc_ids, results):
+            if result is not None:
+                tokens, metadata = result
+                processed_documents[doc_id] = {
+                    'tokens': tokens,
+                    'metadata': metadata,
+                }
 
         return processed_documents
 
+    def process_document(self, document, metadata):
+        """Read and tokenize one crawled page, returning (tokens, metadata) or None."""
+        html_path = os.path.join(self.data_dir, document)
+        html_content = self.read_html_file(html_path)
+        if html_content:
+            return self.text_processor.process_document(html_content, metadata)
+        return None
+
     def read_html_file(self, document):
+        # Raw bytes: the parser decodes them, and a stray invalid byte no
+        # longer aborts the whole build with UnicodeDecodeError
         try:
-            with open(document, 'r', encoding='utf-8') as f:
+            with open(document, 'rb') as f:
                 return f.read()
         except IOError as e:
             print(f'Error reading {document}: {e}')
@@ -90,32 +173,70 @@ class Indexer:
     def save_index_metadata(self, inverted_index, document_metadata):
         os.makedirs(self.index_dir, exist_ok=True)
 
+        # Compact JSON through the C encoder, written in slices so the
+        # whole file is never held in memory as one string
         index_file = os.path.join(self.index_dir, 'inverted_index.json')
         with open(index_file, 'w', encoding='utf-8') as f:
-            json.dump(inverted_index, f, indent=2)
+            write_compact_json(f, inverted_index)
 
         metadata_file = os.path.join(self.index_dir, 'document_metadata.json')
         with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(document_metadata, f, indent=2)
+            write_compact_json(f, document_metadata)
+
+        # Same postings again as terms.json + postings.bin for memory-mapped loading
+        write_mapped_index(self.index_dir, inverted_index)
 
     def load_index_metadata(self):
         index_file = os.path.join(self.index_dir, 'inverted_index.json')
-        metadata_file = os.path.join(self.index_dir, 'document_metadata.json')
 
         inverted_index = {}
-        document_metadata = {}
 
         if os.path.exists(index_file):
-            with open(index_file, 'r', encoding='utf-8') as f:
-                inverted_index = json.load(f)
+            try:
+                with open(index_file, 'r', encoding='utf-8') as f:
+                    inverted_index = json.load(f)
+            except json.JSONDecodeError:
+                print(f"Error reading JSON from {index_file}")
+                return None, None
         else:
             print(f"Inverted index file not found: {index_file}")
             return None, None
 
+        document_metadata = self.load_document_metadata()
+        if document_metadata is None:
+            return None, None
+
+        return inverted_index, document_metadata
+
+    def load_mapped_index(self):
+        # Memory-mapped postings plus parsed metadata; inverted_index.json
+        # is not read at all
+        try:
+            inverted_index = MappedInvertedIndex(self.index_dir)
+        except FileNotFoundError:
+            return None, None
+        except (ValueError, KeyError):
+            print(f"Error reading mapped index from {self.index_dir}")
+            return None, None
+
+        document_metadata = self.load_document_metadata()
+        if document_metadata is None:
+            return None, None
+
+        return inverted_index, document_metadata
+
+    def load_document_metadata(self):
+        metadata_file = os.path.join(self.index_dir, 'document_metadata.json')
+
+        document_metadata = {}
         if os.path.exists(metadata_file):
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                document_metadata = json.load(f)
+            try:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    document_metadata = json.load(f)
+            except json.JSONDecodeError:
+                print(f"Error reading JSON from {metadata_file}")
+                return None
         else:
             print(f"Metadata file not found: {metadata_file}")
 
-        return inverted_index, document_metadata
+        return document_metadata
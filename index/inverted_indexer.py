@@ -1,5 +1,39 @@
 import json
+import mmap
 import os
+from array import array
+from collections.abc import Mapping
+from itertools import islice
+
+# Memory-mapped index layout: terms.json header plus raw postings.bin
+MAPPED_TERMS_FILE = 'terms.json'
+MAPPED_POSTINGS_FILE = 'postings.bin'
+
+# First bytes of postings.bin; the build's generation id follows
+MAPPED_POSTINGS_MAGIC = b'TSPOST1\n'
+
+# Top-level entries encoded per write by write_compact_json
+JSON_WRITE_CHUNK = 2048
+
+_compact_json_encode = json.JSONEncoder(separators=(',', ':')).encode
+
+
+def write_compact_json(f, mapping):
+    """Write a dict as compact JSON, encoding a slice of its entries at a time."""
+    # Each slice goes through the C encoder (one-shot encode, no indent),
+    # so the output matches json.dumps while only one slice's text is
+    # held in memory instead of the whole file
+    items = iter(mapping.items())
+    separator = '{'
+    while True:
+        chunk = dict(islice(items, JSON_WRITE_CHUNK))
+        if not chunk:
+            break
+        f.write(separator)
+        f.write(_compact_json_encode(chunk)[1:-1])
+        separator = ','
+    f.write('}' if separator == ',' else '{}')
+
 
 class InvertedIndex:
     def __init__(self):
@@ -23,11 +57,20 @@ class InvertedIndex:
         else:
             return []
 
+    def approximate_size_bytes(self):
+        # Term and doc id characters plus 8 bytes per score, summed without
+        # building a string of the whole index. Not cached: callers mutate
+        # self.index directly, so a cached total could go stale
+        return sum(
+            len(term) + sum(map(len, documents)) + 8 * len(documents)
+            for term, documents in self.index.items()
+        )
+
     def get_index_stats(self):
         return {
             'total_documents': len(self.document_metadata),
             'total_terms': len(self.index),
-            'index_size_bytes': len(str(self.index))  
+            'index_size_bytes': self.approximate_size_bytes()
         }
 
     def save_to_file(self, filename):
@@ -35,7 +78,7 @@ class InvertedIndex:
 
         try:
             with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(self.index, f, indent=2)
+                write_compact_json(f, self.index)
             print(f'Index saved to {filename}')
         except IOError as e:
             print(f'Error saving index: {e}')
@@ -51,3 +94,132 @@ class InvertedIndex:
         except json.JSONDecodeError:
             print(f"Error reading JSON from {filename}")
             return False
+
+
+class CompactInvertedIndex(Mapping):
+    """Read-only inverted index holding each term's postings as parallel arrays.
+
+    Doc ids are stored once in a shared table and referenced by position, and
+    scores are kept as raw doubles, so a posting costs 12 bytes instead of a
+    dict entry plus a boxed float. Looking a term up rebuilds its
+    {doc_id: score} dict in the original posting order, with exact scores.
+    """
+
+    def __init__(self, inverted_index):
+        doc_numbers = {}
+        number_of = doc_numbers.setdefault
+        self.postings = {}
+        for term, documents in inverted_index.items():
+            ids = array('i', [number_of(doc_id, len(doc_numbers)) for doc_id in documents])
+            self.postings[term] = (ids, array('d', documents.values()))
+        self.doc_ids = list(doc_numbers)
+
+    def __getitem__(self, term):
+        ids, scores = self.postings[term]
+        return dict(zip(map(self.doc_ids.__getitem__, ids), scores))
+
+    def __contains__(self, term):
+        return term in self.postings
+
+    def __iter__(self):
+        return iter(self.postings)
+
+    def __len__(self):
+        return len(self.postings)
+
+    def posting_count(self, term):
+        return len(self.postings[term][0])
+
+
+def write_mapped_index(index_dir, inverted_index):
+    """Write an inverted index as postings.bin plus its terms.json header."""
+    # postings.bin starts with MAPPED_POSTINGS_MAGIC and an 8-byte generation
+    # id. Per term it then holds scores as doubles, then doc numbers as int32
+    # padded to a multiple of 8 bytes, so every score block stays aligned.
+    # terms.json holds the doc id table, each term's [byte offset, posting
+    # count], and the generation id and total size of the postings.bin it
+    # describes.
+    os.makedirs(index_dir, exist_ok=True)
+    postings_file = os.path.join(index_dir, MAPPED_POSTINGS_FILE)
+    terms_file = os.path.join(index_dir, MAPPED_TERMS_FILE)
+    generation = os.urandom(8)
+
+    doc_numbers = {}
+    number_of = doc_numbers.setdefault
+    terms = {}
+    offset = len(MAPPED_POSTINGS_MAGIC) + len(generation)
+    with open(postings_file + '.tmp', 'wb') as f:
+        f.write(MAPPED_POSTINGS_MAGIC)
+        f.write(generation)
+        for term, documents in inverted_index.items():
+            ids = array('i', [number_of(doc_id, len(doc_numbers)) for doc_id in documents])
+            if len(ids) % 2:
+                ids.append(0)
+            f.write(array('d', documents.values()))
+            f.write(ids)
+            terms[term] = [offset, len(documents)]
+            offset += 8 * len(documents) + 4 * len(ids)
+
+    with open(terms_file + '.tmp', 'w', encoding='utf-8') as f:
+        write_compact_json(f, {'generation': generation.hex(), 'size': offset,
+                               'doc_ids': list(doc_numbers), 'terms': terms})
+
+    # Both files are complete before either is renamed, and terms.json goes
+    # last as the commit point. A reader that pairs a terms.json with a
+    # postings.bin from another build sees the generation mismatch and
+    # rejects the pair; a process still mapping the old postings.bin keeps
+    # reading the old data.
+    os.replace(postings_file + '.tmp', postings_file)
+    os.replace(terms_file + '.tmp', terms_file)
+
+
+class MappedPostings(Mapping):
+    """term -> (doc numbers, scores) as memoryviews over a mapped postings.bin."""
+
+    def __init__(self, terms, data):
+        self.terms = terms
+        self.data = data
+
+    def __getitem__(self, term):
+        offset, count = self.terms[term]
+        ids_start = offset + 8 * count
+        data = self.data
+        return data[ids_start:ids_start + 4 * count].cast('i'), data[offset:ids_start].cast('d')
+
+    def __contains__(self, term):
+        return term in self.terms
+
+    def __iter__(self):
+        return iter(self.terms)
+
+    def __len__(self):
+        return len(self.terms)
+
+
+class MappedInvertedIndex(CompactInvertedIndex):
+    """CompactInvertedIndex read from a memory-mapped postings.bin.
+
+    Only terms.json is parsed when the index is opened. A term's postings
+    are sliced out of the map without copying when it is looked up, and
+    the OS pages them in on demand, so startup cost and resident memory
+    grow with the terms actually queried rather than with the index.
+    """
+
+    def __init__(self, index_dir):
+        with open(os.path.join(index_dir, MAPPED_TERMS_FILE), 'r', encoding='utf-8') as f:
+            header = json.load(f)
+        with open(os.path.join(index_dir, MAPPED_POSTINGS_FILE), 'rb') as f:
+            # mmap refuses empty files; those fail the checks below anyway
+            if os.fstat(f.fileno()).st_size:
+                data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            else:
+                data = memoryview(b'')
+
+        # terms.json offsets are only valid for the postings.bin written with
+        # it; a pair from different builds (e.g. read mid-rebuild) is rejected
+        magic_size = len(MAPPED_POSTINGS_MAGIC)
+        if (len(data) != header['size'] or data[:magic_size] != MAPPED_POSTINGS_MAGIC
+                or data[magic_size:magic_size + 8].hex() != header['generation']):
+            raise ValueError('postings.bin does not match terms.json')
+        self.doc_ids = header['doc_ids']
+        self.postings = MappedPostings(header['terms'], data)
\ No newline at end of file
@@ -1,45 +1,143 @@
-from bs4 import BeautifulSoup
+import io
+import sys
+from itertools import filterfalse
+from lxml import etree
 import re
 from typing import List
 import time
+import unicodedata
 
+# Bytes of HTML fed to the streaming parser at a time
+PARSE_CHUNK_SIZE = 64 * 1024
+
+# Elements whose content is never page text
+SKIPPED_TAGS = frozenset({'script', 'style', 'template'})
+
+# Characters stripped from tokens: anything but ASCII letters, digits and whitespace
+NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9\s]')
+
+# ASCII fast path of clean_text: bytes.translate maps '-' to a space and
+# deletes exactly the ASCII characters NON_ALNUM_RE strips
+ASCII_HYPHEN_TABLE = bytes(range(256)).replace(b'-', b' ')
+ASCII_STRIPPED = bytes(b for b in range(128) if b != ord('-') and NON_ALNUM_RE.match(chr(b)))
+
+# Common English words dropped from documents and queries; module-level so
+# every TextProcessor (and every pool worker) shares one set
+STOPWORDS = frozenset({
+    # Articles
+    'the', 'a', 'an',
+    # Conjunctions
+    'and', 'or', 'but', 'nor', 'yet', 'so',
+    # Prepositions
+    'in', 'on', 'at', 'to', 'for', 'of', 'by', 'from', 'up', 'down', 'into', 'onto',
+    'through', 'during', 'before', 'after', 'since', 'until', 'against', 'among', 'between',
+    'behind', 'beneath', 'beside', 'beyond', 'inside', 'outside', 'under', 'over', 'above', 'below',
+    # Pronouns
+    'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
+    'my', 'your', 'his', 'her', 'its', 'our', 'their', 'mine', 'yours', 'his', 'hers', 'ours', 'theirs',
+    'myself', 'yourself', 'himself', 'herself', 'itself', 'ourselves', 'yourselves', 'themselves',
+    # Common verbs
+    'am', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
+    'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can', 'must', 'shall',
+    # Demonstratives
+    'this', 'that', 'these', 'those',
+    # Common words
+    'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not',
+    'only', 'own', 'same', 'so', 'than', 'too', 'very', 'just', 'now', 'then', 'here', 'there'
+})
+
+
+def _strip_text(text):
+    # Lowercase, hyphens to spaces, other NON_ALNUM_RE characters deleted
+    if text.isascii():
+        # ASCII is already NFC, and bytes.lower/translate are single C passes
+        # with no regex engine involved
+        return text.encode('ascii').lower().translate(ASCII_HYPHEN_TABLE, ASCII_STRIPPED).decode('ascii')
+
+    # Compose characters first so precomposed and decomposed forms of
+    # the same text (e.g. "é" vs "e" + U+0301) clean to the same tokens
+    text = unicodedata.normalize('NFC', text)
+    return NON_ALNUM_RE.sub('', text.lower().replace('-', ' '))
+
+
+class PageTextTarget:
+    """lxml parser target that collects a page's title and text as it streams."""
 
-class TextProcessor:
     def __init__(self):
-        self.stopwords = {
-                    # Articles
-                    'the', 'a', 'an',
-                    # Conjunctions
-                    'and', 'or', 'but', 'nor', 'yet', 'so',
-                    # Prepositions
-                    'in', 'on', 'at', 'to', 'for', 'of', 'by', 'from', 'up', 'down', 'into', 'onto',
-                    'through', 'during', 'before', 'after', 'since', 'until', 'against', 'among', 'between',
-                    'behind', 'beneath', 'beside', 'beyond', 'inside', 'outside', 'under', 'over', 'above', 'below',
-                    # Pronouns
-                    'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
-                    'my', 'your', 'his', 'her', 'its', 'our', 'their', 'mine', 'yours', 'his', 'hers', 'ours', 'theirs',
-                    'myself', 'yourself', 'himself', 'herself', 'itself', 'ourselves', 'yourselves', 'themselves',
-                    # Common verbs
-                    'am', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
-                    'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can', 'must', 'shall',
-                    # Demonstratives
-                    'this', 'that', 'these', 'those',
-                    # Common words
-                    'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not',
-                    'only', 'own', 'same', 'so', 'than', 'too', 'very', 'just', 'now', 'then', 'here', 'there'
-        }
+        self.title = None
+        self._text = io.StringIO()
+        self._pending = []
+        self._title_parts = None
+        self._skip_depth = 0
 
-    
-    def extract_text_from_html(self, html_content) -> str:
-        soup = BeautifulSoup(html_content, 'lxml')
+    def _flush(self):
+        # A tag or comment ends the current text node; one node can arrive
+        # as several data() calls, so pieces are joined before splitting
+        if self._pending:
+            words = ''.join(self._pending).split()
+            self._pending.clear()
+            if words:
+                self._text.write(' '.join(words))
+                self._text.write(' ')
+
+    def start(self, tag, attrib):
+        self._flush()
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == 'title' and self._title_parts is None:
+            self._title_parts = []
+
+    def end(self, tag):
+        self._flush()
+        if tag in SKIPPED_TAGS:
+            self._skip_depth -= 1
+        elif tag == 'title' and self.title is None and self._title_parts is not None:
+            self.title = ''.join(self._title_parts)
 
-        for tag in ['script', 'style']:
-            for element in soup.find_all(tag):
-                element.decompose()
+    def data(self, data):
+        if self.title is None and self._title_parts is not None:
+            self._title_parts.append(data)
+        if not self._skip_depth:
+            self._pending.append(data)
 
-        text = ' '.join(soup.get_text(separator=' ', strip=True).split())
+    def comment(self, text):
+        self._flush()
 
-        return text
+    def pi(self, target, data=None):
+        self._flush()
+
+    def doctype(self, name, pubid, system):
+        self._flush()
+
+    def close(self):
+        self._flush()
+        return self._text.getvalue().rstrip(' ')
+
+
+class TextProcessor:
+    def __init__(self):
+        self.stopwords = STOPWORDS
+
+    
+    def parse_html(self, html_content):
+        """Stream a page through lxml and return its (title, text)."""
+        # Crawled pages are stored as UTF-8, so raw bytes are handed to the
+        # parser with that encoding instead of being decoded in Python first.
+        # No tree is built: memory stays close to the size of the text
+        target = PageTextTarget()
+        encoding = 'utf-8' if isinstance(html_content, bytes) else None
+        parser = etree.HTMLParser(target=target, encoding=encoding)
+        for start in range(0, len(html_content), PARSE_CHUNK_SIZE):
+            parser.feed(html_content[start:start + PARSE_CHUNK_SIZE])
+        try:
+            text = parser.close()
+        except etree.XMLSyntaxError:
+            # Empty or unparseable page: keep whatever was collected
+            text = target.close()
+        return target.title, text
+
+    def extract_text_from_html(self, html_content) -> str:
+        return self.parse_html(html_content)[1]
 
     def normalize_tokens(self, token: str) -> str:
         # Convert to lowercase first
@@ -47,41 +145,45 @@ class TextProcessor:
         # Replace hyphens with spaces
         token = token.replace('-', ' ')
         # Remove special characters but keep alphanumeric and spaces
-        token = re.sub(r'[^a-zA-Z0-9\s]', '', token).strip()
+        token = NON_ALNUM_RE.sub('', token).strip()
         return token
     
 
     def clean_text(self, text: str) -> str:
+        # Same steps as normalize_tokens, applied once to the whole text;
+        # stripped characters are deleted (not spaced) so "3.9" stays "39"
+        text = _strip_text(text)
+        # Stop words are dropped by filterfalse in C, with no Python-level
+        # loop body per token
+        return ' '.join(filterfalse(self.stopwords.__contains__, text.split()))
 
-        words = text.split()
-        cleaned_words = []
+    def clean_text_batch(self, texts: List[str]) -> List[List[str]]:
+        """Return clean_text(text).split() for each text, cleaned in one pass."""
+        if not texts:
+            return []
 
-        for word in words:
-            cleaned_word = self.normalize_tokens(word)
-            
-            if ' ' in cleaned_word:
-                split_words = cleaned_word.split()
-                for split_word in split_words:
-                    if split_word and split_word not in self.stopwords:
-                        cleaned_words.append(split_word)
-            else:           
-                if cleaned_word and cleaned_word not in self.stopwords:
-                    cleaned_words.append(cleaned_word)        
-        
-        return ' '.join(cleaned_words)
+        # The texts are joined on newlines so normalize/lower/sub run once
+        # over the whole batch; none of them merge or drop a newline, so
+        # splitting on it again gives back one line per text
+        text = '\n'.join(texts)
+        if text.count('\n') != len(texts) - 1:
+            # A text holds a newline of its own; clean each separately
+            return [self.clean_text(text).split() for text in texts]
+
+        text = _strip_text(text)
+        is_stopword = self.stopwords.__contains__
+        return [list(filterfalse(is_stopword, line.split())) for line in text.split('\n')]
     
     
     def process_document(self, html_content, metadata=None):
-        soup = BeautifulSoup(html_content, 'lxml')
-        
-        # Extract title from HTML
-        title_tag = soup.find('title')
-        title = title_tag.get_text().strip() if title_tag else 'No title'
+        # Title and text come from the same streaming pass
+        title, text = self.parse_html(html_content)
+        title = title.strip() if title is not None else 'No title'
         
-        # Extract text content
-        text = self.extract_text_from_html(html_content)
         cleaned_text = self.clean_text(text)
-        tokens = cleaned_text.split()
+        # One shared str object per distinct term instead of one per
+        # occurrence; dict lookups on them hit the identity fast path
+        tokens = list(map(sys.intern, cleaned_text.split()))
 
         if metadata is None:
             metadata = {}
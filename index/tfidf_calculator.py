@@ -1,22 +1,13 @@
 import math
+from collections import Counter
 
 class TFIDFCalculator:
     def __init__(self):
         pass  # Optional, but kept since you defined it
 
     def calculate_term_frequency(self, tokens):
-        token_count = {}
-        for token in tokens:
-            if token in token_count:
-                token_count[token] += 1
-            else:
-                token_count[token] = 1
-
-        total_tokens = len(tokens)
-        for token in token_count:
-            token_count[token] = token_count[token] / total_tokens
-
-        return token_count
+        inv_total = 1.0 / len(tokens) if tokens else 0.0
+        return {token: count * inv_total for token, count in Counter(tokens).items()}
 
     def calculate_document_count(self, all_tokens):
         doc_count = {}
@@ -29,22 +20,38 @@ class TFIDFCalculator:
                     doc_count[word] = 1
         return doc_count
 
-    def calculate_tfidf_scores(self, term_frequencies, document_counts, total_documents):
-        tfidf_scores = {}
-        for word, tf in term_frequencies.items():
-            df = document_counts.get(word, 0)
+    def calculate_idf(self, document_counts, total_documents):
+        # One log per corpus term, shared by every document's TF-IDF pass
+        return {word: math.log(total_documents / df) for word, df in document_counts.items() if df > 0}
 
-            if df > 0:
-                idf = math.log(total_documents / df)
-            else:
-                idf = 0
+    def calculate_tfidf_scores(self, term_frequencies, document_counts, total_documents, idf=None):
+        if idf is None:
+            idf = self.calculate_idf(document_counts, total_documents)
 
-            tfidf_scores[word] = tf * idf
+        get_idf = idf.get
+        tfidf_scores = {word: tf * get_idf(word, 0) for word, tf in term_frequencies.items()}
 
         tfidf_scores = self.normalize_score(tfidf_scores)
 
         return tfidf_scores
 
+    def build_tfidf_matrix(self, all_tokens):
+        # Count each document once; the counts feed both DF and TF
+        doc_counts = [Counter(tokens) for tokens in all_tokens]
+        document_counts = Counter()
+        for counts in doc_counts:
+            document_counts.update(counts.keys())
+        idf = self.calculate_idf(document_counts, len(doc_counts))
+
+        matrix = []
+        get_idf = idf.get
+        for counts, tokens in zip(doc_counts, all_tokens):
+            inv_total = 1.0 / len(tokens) if tokens else 0.0
+            tfidf_scores = {word: count * inv_total * get_idf(word, 0) for word, count in counts.items()}
+            matrix.append(self.normalize_score(tfidf_scores))
+
+        return matrix
+
     def normalize_score(self, tfidf_scores):
         magnitude = math.sqrt(sum(score ** 2 for score in tfidf_scores.values()))
 
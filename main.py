@@ -5,6 +5,7 @@ Provides a complete workflow for crawling, indexing, and searching web content.
 """
 
 import argparse
+import logging
 import sys
 import os
 from typing import List, Dict
@@ -23,10 +24,11 @@ class TechScopeSearchEngine:
         self.indexer = None
         self.query_engine = None
         
-    def setup_crawler(self, urls: List[str], max_pages: int = 20, crawl_delay: float = 0.005):
+    def setup_crawler(self, urls: List[str], max_pages: int = 20, crawl_delay: float = 0.005,
+                      data_dir: str = 'data/pages'):
         """Initialize the web crawler."""
         print("🕷️  Setting up web crawler...")
-        self.crawler = Crawler(seed_urls=urls, max_pages=max_pages, crawl_delay=crawl_delay)
+        self.crawler = Crawler(seed_urls=urls, max_pages=max_pages, data_dir=data_dir, crawl_delay=crawl_delay)
         print(f"✅ Crawler ready for {len(urls)} URLs, max {max_pages} pages each, delay: {crawl_delay}s")
         
     def auto_setup(self, crawl_delay=None):
@@ -56,19 +58,20 @@ class TechScopeSearchEngine:
         
         print(f"🚀 Auto-setup: Loading seed URLs and crawling...")
         
-        # Setup and run crawler
-        self.setup_crawler(seed_urls, max_pages=max_pages, crawl_delay=crawl_delay)
+        # Setup all components, then crawl and index
+        self.setup_all(seed_urls, max_pages=max_pages, crawl_delay=crawl_delay)
         self.crawl_websites()
-        
-        # Setup and run indexer
-        self.setup_indexer()
         self.build_index()
         
-        # Setup query engine
-        self.setup_query_engine()
-        
         print("✅ Auto-setup completed! Ready for queries.")
         
+    def setup_all(self, urls: List[str], index_dir: str = 'index/data', data_dir: str = 'data/pages',
+                  max_pages: int = 20, crawl_delay: float = 0.005):
+        """Initialize the crawler, indexer and query engine over the same directories."""
+        self.setup_crawler(urls, max_pages=max_pages, crawl_delay=crawl_delay, data_dir=data_dir)
+        self.setup_indexer(data_dir, index_dir)
+        self.setup_query_engine(index_dir)
+        
     def setup_indexer(self, data_dir: str = 'data/pages', index_dir: str = 'index/data'):
         """Initialize the indexer."""
         print("📚 Setting up indexer...")
@@ -198,6 +201,8 @@ Examples:
                        help='Maximum results to return (default: 10)')
     parser.add_argument('--stats', action='store_true',
                        help='Show search engine statistics')
+    parser.add_argument('--verbose', action='store_true',
+                       help='Log every crawled page, not just progress summaries')
     
     # Configuration arguments
     parser.add_argument('--data-dir', default='data/pages',
@@ -207,6 +212,11 @@ Examples:
     
     args = parser.parse_args()
     
+    # Crawler progress goes through logging; per-page events are DEBUG
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    if args.verbose:
+        logging.getLogger('crawler').setLevel(logging.DEBUG)
+    
     # Initialize the search engine
     engine = TechScopeSearchEngine()
     
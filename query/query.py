@@ -1,19 +1,52 @@
 import json
 import os
+import threading
+import time
+from collections import OrderedDict
 from typing import List, Dict
 from .query_processor import QueryProcessor
 from .result_formatter import ResultFormatter
 from .search_engine import SearchEngine
 from index.indexer import Indexer
+from index.inverted_indexer import CompactInvertedIndex, MAPPED_POSTINGS_FILE, MAPPED_TERMS_FILE
+from index.document_table import DocumentTable
+
+# Most recent distinct queries whose formatted results are kept
+RESULT_CACHE_SIZE = 512
+
+# Seconds a cached result list stays valid
+RESULT_CACHE_TTL = 300.0
+
+INDEX_FILES = ('inverted_index.json', 'document_metadata.json')
+
+# Written by the indexer alongside INDEX_FILES; used instead of
+# inverted_index.json when present
+MAPPED_INDEX_FILES = (MAPPED_TERMS_FILE, MAPPED_POSTINGS_FILE)
 
 
 class Query:
-    def __init__(self, index_dir='index/data'):
+    def __init__(self, index_dir='index/data', cache_size=RESULT_CACHE_SIZE, cache_ttl=RESULT_CACHE_TTL):
         self.index_dir = index_dir
         self.query_processor = QueryProcessor()
         # Initialize these to None - they'll be set when we load the index
+        self.inverted_index = None
+        self.document_metadata = None
         self.result_formatter = None
         self.search_engine = None
+        # (mtime, size) of the index files the loaded index came from
+        self._index_signature = None
+        # (query tokens, max_results) -> (expiry time, formatted results)
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._result_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @classmethod
+    def from_dicts(cls, inverted_index: Dict, document_metadata: Dict) -> 'Query':
+        """Create a Query over an in-memory index without reading index files."""
+        query = cls(index_dir=None)
+        query._set_index(inverted_index, document_metadata)
+        return query
 
     
     def search(self, user_query: str, max_results: int = 10) -> List[Dict]:
@@ -23,20 +56,108 @@ class Query:
             print("Warning: Index files not found. Please run the indexer first.")
             return []
         
-        # Initialize components with loaded data
-        self.result_formatter = ResultFormatter(document_metadata)
-        self.search_engine = SearchEngine(inverted_index, document_metadata)
-        
         processed_query = self.query_processor.process_query(user_query)
-        search_results = self.search_engine.search(processed_query)
+        cache_key = (tuple(processed_query), max_results)
+        cached = self._cached_results(cache_key)
+        if cached is not None:
+            return cached
+
+        search_results = self.search_engine.search(processed_query, max_results)
         formatted_results = self.result_formatter.format_results(search_results, max_results)
+        self._cache_results(cache_key, formatted_results)
 
         return formatted_results
 
+    def _cached_results(self, cache_key):
+        if not self.cache_size:
+            return None
+
+        with self._cache_lock:
+            entry = self._result_cache.get(cache_key)
+            if entry is None:
+                return None
+            expires_at, results = entry
+            if expires_at < time.monotonic():
+                del self._result_cache[cache_key]
+                return None
+            self._result_cache.move_to_end(cache_key)
+
+        # Fresh result dicts, so callers can't modify the cached copy
+        return [dict(result) for result in results]
+
+    def _cache_results(self, cache_key, results):
+        if not self.cache_size:
+            return
+
+        entry = (time.monotonic() + self.cache_ttl, [dict(result) for result in results])
+        with self._cache_lock:
+            self._result_cache[cache_key] = entry
+            self._result_cache.move_to_end(cache_key)
+            while len(self._result_cache) > self.cache_size:
+                self._result_cache.popitem(last=False)
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._result_cache.clear()
+
     
     def load_index(self):
-        indexer = Indexer()
-        return indexer.load_index_metadata()
+        # Index files are read once and reread only when they change on
+        # disk; in-memory indexes (from_dicts) have no files to watch
+        signature = self._index_signature
+        if self.index_dir is not None:
+            signature = self.index_file_signature()
+
+        if self.inverted_index is None or self.document_metadata is None or signature != self._index_signature:
+            indexer = Indexer(index_dir=self.index_dir)
+            inverted_index = None
+            if self.has_mapped_index():
+                # Postings stay on disk and are paged in per queried term
+                inverted_index, document_metadata = indexer.load_mapped_index()
+            if inverted_index is None:
+                # No mapped files, or a terms.json/postings.bin pair that
+                # does not match (e.g. read mid-rebuild): use the JSON index
+                inverted_index, document_metadata = indexer.load_index_metadata()
+                if inverted_index is not None:
+                    inverted_index = CompactInvertedIndex(inverted_index)
+
+            if inverted_index is None or document_metadata is None:
+                return None, None
+
+            # Keep the postings and metadata in array/column form; the
+            # parsed dicts are dropped
+            self._set_index(inverted_index, DocumentTable(document_metadata))
+            self._index_signature = signature
+
+        return self.inverted_index, self.document_metadata
+
+    def has_mapped_index(self):
+        return all(os.path.exists(os.path.join(self.index_dir, name)) for name in MAPPED_INDEX_FILES)
+
+    def index_file_signature(self):
+        signature = []
+        for name in INDEX_FILES:
+            try:
+                stat = os.stat(os.path.join(self.index_dir, name))
+            except OSError:
+                return None
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        for name in MAPPED_INDEX_FILES:
+            try:
+                stat = os.stat(os.path.join(self.index_dir, name))
+            except OSError:
+                continue
+            signature.append((name, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _set_index(self, inverted_index, document_metadata):
+        # Initialize components with loaded data
+        self.result_formatter = ResultFormatter(document_metadata)
+        self.search_engine = SearchEngine(inverted_index, document_metadata)
+        self.inverted_index = inverted_index
+        self.document_metadata = document_metadata
+        # Results from a previous index no longer apply
+        self.clear_cache()
     
 
     def get_search_stats(self) -> Dict:
@@ -53,7 +174,11 @@ class Query:
         total_documents = len(document_metadata)
         total_terms = len(inverted_index)
         
-        index_size = sum(len(docs) for docs in inverted_index.values())
+        if isinstance(inverted_index, CompactInvertedIndex):
+            # Count from the arrays instead of rebuilding every posting dict
+            index_size = sum(map(inverted_index.posting_count, inverted_index))
+        else:
+            index_size = sum(len(docs) for docs in inverted_index.values())
         
         return {
             'status': 'Index loaded successfully',
@@ -1,9 +1,18 @@
-from typing import List
+import functools
+from typing import Iterable, List, Optional, Tuple
 from index.text_processor import TextProcessor
 
+# Most recent distinct queries whose tokens process_query keeps
+PROCESS_CACHE_SIZE = 4096
+
 class QueryProcessor:
-    def __init__(self):
+    def __init__(self, cache_size=PROCESS_CACHE_SIZE):
         self.text_processor = TextProcessor()
+        # Per instance, so cached tokens always come from this processor's
+        # own text_processor. The cache wraps a bound method and so refers
+        # back to self; that cycle is left to the garbage collector, and
+        # close() drops the cached tokens without waiting for it.
+        self._process = functools.lru_cache(maxsize=cache_size)(self._process_uncached)
     
     def clean_query(self, query: str) -> str:
         if query is None:
@@ -16,6 +25,27 @@ class QueryProcessor:
         return query.split()
 
     def process_query(self, user_query: str) -> List[str]:
+        # Tokens are cached as tuples; every caller gets its own list
+        return list(self._process(user_query))
+
+    def _process_uncached(self, user_query: str) -> Tuple[str, ...]:
         cleaned_query = self.clean_query(user_query)
         tokens = self.tokenize_query(cleaned_query)
-        return tokens
+        return tuple(tokens)
+
+    def cache_info(self):
+        """Hits, misses, maxsize and currsize of the process_query cache."""
+        return self._process.cache_info()
+
+    def cache_clear(self):
+        """Forget every query process_query has cached."""
+        self._process.cache_clear()
+
+    def close(self):
+        """Release the cached tokens; the processor stays usable."""
+        self.cache_clear()
+
+    def process_queries(self, user_queries: Iterable[Optional[str]]) -> List[List[str]]:
+        """Process many queries at once; same tokens as process_query on each."""
+        return self.text_processor.clean_text_batch(
+            ["" if query is None else query for query in user_queries])
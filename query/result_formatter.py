@@ -1,4 +1,6 @@
-from typing import List, Dict
+import heapq
+from operator import itemgetter
+from typing import Dict, Iterable, List, Tuple, Union
 
 class ResultFormatter:
     def __init__(self, document_metadata):
@@ -6,22 +8,32 @@ class ResultFormatter:
     
     def format_results(self, search_results: Dict[str, float], max_results: int) -> List[Dict]:
 
-        sorted_items = sorted(search_results.items(), key=lambda x: x[1], reverse=True)  # list of tuples
-        sorted_results = dict(sorted_items[:max_results])  # limit, then convert back to dict
+        # Top max_results by score without sorting the rest; same order as
+        # sorted(..., reverse=True)[:max_results], ties included
+        top_items = heapq.nlargest(max_results, search_results.items(), key=itemgetter(1))
 
-        formatted_results = self.add_metadata(sorted_results)
+        formatted_results = self.add_metadata(top_items)
 
         return formatted_results
 
-    def add_metadata(self, results: Dict[str, float]) -> List[Dict]:
+    def add_metadata(self, results: Union[Dict[str, float], Iterable[Tuple[str, float]]]) -> List[Dict]:
+        # Ranked (doc_id, score) pairs are used as-is; a dict gives its items
+        if isinstance(results, dict):
+            results = results.items()
+
         formatted_results = []
-        for key, value in results.items():
-            result_metadata = {'doc_id': key, 'score': value}
-            for doc_id, metadata in self.document_metadata.items():
-                if doc_id == key:
-                    for meta_key, meta_value in metadata.items():
-                        if meta_key != 'score' and meta_key != 'doc_id':
-                            result_metadata[meta_key] = meta_value
+        md_get = self.document_metadata.get
+        for key, value in results:
+            metadata = md_get(key)
+            if metadata:
+                # One merge; fields already in place keep their position
+                result_metadata = {'doc_id': key, 'score': value, **metadata}
+                if 'doc_id' in metadata or 'score' in metadata:
+                    # Search values win over same-named metadata fields
+                    result_metadata['doc_id'] = key
+                    result_metadata['score'] = value
+            else:
+                result_metadata = {'doc_id': key, 'score': value}
             formatted_results.append(result_metadata)
 
         return formatted_results
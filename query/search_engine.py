@@ -1,31 +1,101 @@
+import heapq
 from index.indexer import Indexer
-from typing import List, Dict
+from index.inverted_indexer import CompactInvertedIndex
+from typing import List, Dict, Optional
 
 
 class SearchEngine:
     def __init__(self, inverted_index, document_metadata):
         self.inverted_index = inverted_index
         self.document_metadata = document_metadata
+        # term -> (highest, lowest) posting score, filled in on first use
+        self._score_bounds = {}
 
     
-    def search(self, query_tokens: List[str]) -> Dict[str, float]:
+    def search(self, query_tokens: List[str], max_results: Optional[int] = None) -> Dict[str, float]:
         if not query_tokens:
             return {}
         
         if self.inverted_index is None:
             return {}
 
-        search_results = {}
+        if max_results is not None:
+            return self.search_top(query_tokens, max_results)
+
+        search_results = None
         for term in query_tokens:
             # Convert term to lowercase for case-insensitive search
             term_lower = term.lower()
             if term_lower in self.inverted_index:
                 term_documents = self.inverted_index[term_lower]
 
+                if search_results is None:
+                    # First matching term: copy its posting list in one C-level pass
+                    search_results = dict(term_documents)
+                    continue
+
+                get_score = search_results.get
                 for doc_id, score in term_documents.items():
-                    if doc_id in search_results:
-                        search_results[doc_id] += score
-                    else:
-                        search_results[doc_id] = score 
+                    search_results[doc_id] = get_score(doc_id, 0) + score
         
+        return search_results if search_results is not None else {}
+
+    def search_top(self, query_tokens: List[str], max_results: int) -> Dict[str, float]:
+        """Like search(), but may leave out documents that cannot reach the top max_results."""
+        terms = [term for term in map(str.lower, query_tokens) if term in self.inverted_index]
+        if not terms:
+            return {}
+
+        # Pruning relies on scores only ever growing as terms are added
+        bounds = [self._term_score_bounds(term) for term in terms]
+        if max_results <= 0 or min(lowest for _, lowest in bounds) < 0:
+            return self.search(terms)
+
+        # remaining_best[i]: most that terms i.. can add to any document
+        remaining_best = [0.0] * (len(terms) + 1)
+        for i in range(len(terms) - 1, -1, -1):
+            remaining_best[i] = remaining_best[i + 1] + bounds[i][0]
+
+        # Terms are added in query order, exactly as search() does, so
+        # every kept document ends with the same score and position
+        search_results = dict(self.inverted_index[terms[0]])
+        admitting = True
+        for i in range(1, len(terms)):
+            term_documents = self.inverted_index[terms[i]]
+
+            # The current top scores cannot exceed what terms ..i-1 can add
+            # up to, so only rank them when that could beat remaining_best[i]
+            if (admitting and len(search_results) >= max_results
+                    and remaining_best[0] - remaining_best[i] > remaining_best[i]):
+                threshold = heapq.nlargest(max_results, search_results.values())[-1]
+                # A document not seen yet scores at most remaining_best[i],
+                # which can no longer reach the current top max_results
+                admitting = remaining_best[i] >= threshold
+
+            if admitting:
+                get_score = search_results.get
+                for doc_id, score in term_documents.items():
+                    search_results[doc_id] = get_score(doc_id, 0) + score
+            elif len(search_results) < len(term_documents):
+                get_term_score = term_documents.get
+                for doc_id, current in search_results.items():
+                    score = get_term_score(doc_id)
+                    if score is not None:
+                        search_results[doc_id] = current + score
+            else:
+                for doc_id, score in term_documents.items():
+                    current = search_results.get(doc_id)
+                    if current is not None:
+                        search_results[doc_id] = current + score
+
         return search_results
+
+    def _term_score_bounds(self, term):
+        bounds = self._score_bounds.get(term)
+        if bounds is None:
+            if isinstance(self.inverted_index, CompactInvertedIndex):
+                scores = self.inverted_index.postings[term][1]
+            else:
+                scores = self.inverted_index[term].values()
+            bounds = self._score_bounds[term] = (max(scores, default=0.0), min(scores, default=0.0))
+        return bounds
@@ -4,39 +4,43 @@ Test script for TechScope Search Engine Main Application
 Demonstrates the complete workflow: crawl → index → search
 """
 
+import io
 import os
 import sys
+from contextlib import redirect_stdout
 from main import TechScopeSearchEngine
 
 def test_complete_workflow():
     """Test the complete search engine workflow."""
+    # Every line, including the engine's own setup messages, is collected
+    # in order and written to stdout once at the end
+    log = io.StringIO()
+    try:
+        with redirect_stdout(log):
+            _run_workflow()
+    finally:
+        sys.stdout.write(log.getvalue())
+
+def _run_workflow():
     print("🧪 Testing TechScope Search Engine Complete Workflow")
     print("=" * 60)
     
     # Initialize the search engine
     engine = TechScopeSearchEngine()
     
-    # Step 1: Setup crawler
-    print("\n1️⃣ Setting up crawler...")
-    engine.setup_crawler(['https://example.com'], max_pages=20, crawl_delay=0.005)
-    
-    # Step 2: Setup indexer
-    print("\n2️⃣ Setting up indexer...")
-    engine.setup_indexer('data/pages', 'index/data')
-    
-    # Step 3: Setup query engine
-    print("\n3️⃣ Setting up query engine...")
-    engine.setup_query_engine('index/data')
+    # Step 1: Setup crawler, indexer and query engine
+    print("\n1️⃣ Setting up crawler, indexer and query engine...")
+    engine.setup_all(['https://example.com'], 'index/data', 'data/pages', max_pages=20, crawl_delay=0.005)
     
-    # Step 4: Test statistics (before crawling)
-    print("\n4️⃣ Testing statistics (before crawling)...")
+    # Step 2: Test statistics (before crawling)
+    print("\n2️⃣ Testing statistics (before crawling)...")
     stats = engine.get_stats()
     print(f"Status: {stats.get('status', 'Unknown')}")
     print(f"Total Documents: {stats.get('total_documents', 0)}")
     print(f"Total Terms: {stats.get('total_terms', 0)}")
     
-    # Step 5: Test search (before indexing)
-    print("\n5️⃣ Testing search (before indexing)...")
+    # Step 3: Test search (before indexing)
+    print("\n3️⃣ Testing search (before indexing)...")
     results = engine.search("example", max_results=5)
     print(f"Search results: {len(results)} found")
     
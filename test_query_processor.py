@@ -3,34 +3,30 @@
 Test script for QueryProcessor
 """
 
+import pytest
+
 from query.query_processor import QueryProcessor
 
-def test_query_processor():
-    print("🧪 Testing QueryProcessor...")
-    
-    # Initialize processor
-    processor = QueryProcessor()
-    
-    # Test cases
-    test_queries = [
-        "Python programming language",
-        "  JavaScript   &   React  ",
-        "Machine Learning with Python!",
-        "the quick brown fox",
-        "",
-        "   "
-    ]
-    
-    for query in test_queries:
-        print(f"\n📝 Original: '{query}'")
-        cleaned = processor.clean_query(query)
-        print(f"🧹 Cleaned: '{cleaned}'")
-        tokens = processor.tokenize_query(cleaned)
-        print(f"🔤 Tokens: {tokens}")
-        
-        # Test full pipeline
-        processed = processor.process_query(query)
-        print(f"⚙️  Processed: {processed}")
+# (query, expected tokens) golden cases
+TEST_QUERIES = [
+    ("Python programming language", ['python', 'programming', 'language']),
+    ("  JavaScript   &   React  ", ['javascript', 'react']),
+    ("Machine Learning with Python!", ['machine', 'learning', 'with', 'python']),
+    ("the quick brown fox", ['quick', 'brown', 'fox']),
+    ("", []),
+    ("   ", []),
+]
+
+@pytest.fixture(scope="module")
+def processor():
+    return QueryProcessor()
+
+@pytest.mark.parametrize("query, expected", TEST_QUERIES)
+def test_process_query(processor, query, expected):
+    assert processor.process_query(query) == expected
+    assert processor.clean_query(query) == ' '.join(expected)
+    assert processor.tokenize_query(processor.clean_query(query)) == expected
 
-if __name__ == "__main__":
-    test_query_processor() 
\ No newline at end of file
+def test_process_queries(processor):
+    queries = [query for query, _ in TEST_QUERIES]
+    assert processor.process_queries(queries) == [expected for _, expected in TEST_QUERIES]